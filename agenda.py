@@ -0,0 +1,140 @@
+"""
+Histórico das agendas diárias (jogos de amanhã, com odds pré-jogo e link do confronto) em dados.db.
+
+Além do CSV diário em jogos_do_dia/, cada agenda raspada é gravada na tabela 'agenda',
+ordenada fisicamente por data (WITHOUT ROWID, chave (Data, Home_Id, Away_Id)): uma consulta
+por intervalo de datas lê só as páginas desse intervalo. A vista 'agenda_completa' junta os nomes.
+
+Importar os CSVs já existentes (idempotente):
+    python agenda.py --importar jogos_do_dia
+"""
+import argparse
+import glob
+import logging
+import os
+import re
+import sys
+
+import pandas as pd
+
+import banco
+
+log = logging.getLogger(__name__)
+
+COLUNAS_AGENDA = ["Data", "Liga", "Hora", "Home", "Away", "Odd_H", "Odd_D", "Odd_A", "Link_Confronto"]
+# nome do CSV em jogos_do_dia/ -> data da agenda (os ficheiros antigos não têm a coluna 'data')
+_DATA_DO_ARQUIVO = re.compile(r"(\d{4}-\d{2}-\d{2})\.csv$")
+
+
+def inicializar_agenda(conn):
+    with conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS agenda (
+            Data TEXT NOT NULL, Home_Id INTEGER NOT NULL REFERENCES times (Id),
+            Away_Id INTEGER NOT NULL REFERENCES times (Id), Liga_Id INTEGER REFERENCES ligas (Id),
+            Hora TEXT, Odd_H REAL, Odd_D REAL, Odd_A REAL, Link_Confronto TEXT,
+            PRIMARY KEY (Data, Home_Id, Away_Id)
+        ) WITHOUT ROWID""")
+        conn.execute("""
+        CREATE VIEW IF NOT EXISTS agenda_completa AS
+        SELECT g.Data, l.Nome AS Liga, g.Hora, h.Nome AS Home, a.Nome AS Away,
+            g.Odd_H, g.Odd_D, g.Odd_A, g.Link_Confronto
+        FROM agenda g
+        JOIN times h ON h.Id = g.Home_Id
+        JOIN times a ON a.Id = g.Away_Id
+        LEFT JOIN ligas l ON l.Id = g.Liga_Id""")
+
+
+def _normalizar(df, data=None):
+    """
+    DataFrame com COLUNAS_AGENDA a partir da agenda raspada (data, liga, hora, home, away,
+    Odd_H/D/A, link_confronto) ou de qualquer um dos formatos antigos de jogos_do_dia/.
+    """
+    df = df.rename(columns={"data": "Data", "liga": "Liga", "hora": "Hora", "home": "Home",
+                            "away": "Away", "link_confronto": "Link_Confronto"})
+    if "id_jogo" in df:
+        # formato antigo: odd_h/odd_d/odd_a vinham desalinhadas (estatísticas nas colunas das odds)
+        df = df.drop(columns=["odd_h", "odd_d", "odd_a"], errors="ignore")
+    if "Data" not in df:
+        df["Data"] = data
+    for coluna in COLUNAS_AGENDA:
+        if coluna not in df:
+            df[coluna] = None
+    df = df[COLUNAS_AGENDA].copy()
+    df["Data"] = df["Data"].astype(str)
+    for coluna in ("Home", "Away"):
+        df[coluna] = df[coluna].map(lambda nome: banco.nome_canonico(nome) if isinstance(nome, str) else None)
+    for coluna in ("Odd_H", "Odd_D", "Odd_A"):
+        df[coluna] = pd.to_numeric(df[coluna], errors="coerce")
+    return df.dropna(subset=["Home", "Away"]).drop_duplicates(subset=["Data", "Home", "Away"], keep="last")
+
+
+def gravar_agenda(conn, jogos, data=None):
+    """
+    Acrescenta (ou atualiza) jogos da agenda: lista de dicts como a de raspar_jogos_de_amanha
+    ou DataFrame de um CSV de jogos_do_dia/. Odds em falta não apagam as já gravadas.
+    Retorna o número de jogos gravados.
+    """
+    df = _normalizar(pd.DataFrame(jogos), data)
+    if df.empty:
+        return 0
+    with conn:
+        times = banco.ids_dimensao(conn, "times", pd.concat([df["Home"], df["Away"]]).unique())
+        ligas = banco.ids_dimensao(conn, "ligas", df["Liga"].dropna().unique())
+        linhas = df.assign(Home_Id=df["Home"].map(times), Away_Id=df["Away"].map(times),
+                           Liga_Id=df["Liga"].map(ligas))
+        linhas = linhas[["Data", "Home_Id", "Away_Id", "Liga_Id", "Hora", "Odd_H", "Odd_D", "Odd_A",
+                         "Link_Confronto"]]
+        linhas = linhas.astype("object").where(linhas.notna(), None)
+        conn.executemany("""
+            INSERT INTO agenda (Data, Home_Id, Away_Id, Liga_Id, Hora, Odd_H, Odd_D, Odd_A, Link_Confronto)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (Data, Home_Id, Away_Id) DO UPDATE SET
+                Liga_Id = COALESCE(excluded.Liga_Id, Liga_Id), Hora = COALESCE(excluded.Hora, Hora),
+                Odd_H = COALESCE(excluded.Odd_H, Odd_H), Odd_D = COALESCE(excluded.Odd_D, Odd_D),
+                Odd_A = COALESCE(excluded.Odd_A, Odd_A),
+                Link_Confronto = COALESCE(excluded.Link_Confronto, Link_Confronto)""",
+            linhas.itertuples(index=False, name=None))
+    return len(df)
+
+
+def importar_csvs(conn, pasta="jogos_do_dia"):
+    """Importa todos os CSVs de agenda da pasta (pode repetir-se: os jogos são atualizados)."""
+    total = 0
+    for caminho in sorted(glob.glob(os.path.join(pasta, "*.csv"))):
+        encontrado = _DATA_DO_ARQUIVO.search(caminho)
+        try:
+            total += gravar_agenda(conn, pd.read_csv(caminho), encontrado.group(1) if encontrado else None)
+        except Exception as e:
+            log.warning(f"[AGENDA] Não foi possível importar {caminho}: {e}")
+    log.info(f"[AGENDA] {total} jogos importados de {pasta}.")
+    return total
+
+
+def carregar_agenda(conn, desde=None, ate=None):
+    """Agendas gravadas entre `desde` e `ate` ("YYYY-MM-DD", inclusivos), com nomes."""
+    return pd.read_sql_query(
+        "SELECT * FROM agenda_completa WHERE Data >= ? AND Data <= ? ORDER BY Data, Hora",
+        conn, params=(desde or "", ate or "9999"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Histórico das agendas diárias em dados.db")
+    parser.add_argument("--importar", metavar="PASTA", help="importa os CSVs de agenda da pasta")
+    parser.add_argument("--db", default="dados.db")
+    args = parser.parse_args(argv)
+    if not args.importar:
+        parser.print_help()
+        return 1
+    conn = banco.conectar(args.db)
+    try:
+        banco.inicializar_banco(conn)
+        inicializar_agenda(conn)
+        print(f"{importar_csvs(conn, args.importar)} jogos importados.")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Ordem e prazo das visitas da fase 3.
+
+As equipas são visitadas por valor, não pela ordem em que a fase 2 as encontrou. A chave de
+ordenação é uma hora "efetiva" de início (menor = primeiro):
+
+    horas até ao jogo de amanhã
+      - HORAS_POR_SEMANA_SEM_DADOS × semanas desde o último jogo gravado da equipa (até ao teto)
+      - HORAS_POR_NIVEL_LIGA × (prioridade da liga - PRIORIDADE_LIGA_PADRAO)
+
+Ou seja, uma equipa de uma liga um nível acima passa à frente de jogos até HORAS_POR_NIVEL_LIGA
+horas mais cedo. Com um orçamento de tempo (Prazo), a fase 3 deixa de pegar em equipas novas
+quando ele se esgota: as que ficam por visitar são as de menor valor, e continuam pendentes no
+checkpoint (--resume).
+"""
+import logging
+import time
+from datetime import date, datetime
+
+import cache_links
+import indice_ligas
+import ligas_config as cfg
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+ORCAMENTO_FASE3_MIN = None         # minutos para a fase 3 (None = sem limite)
+HORAS_POR_SEMANA_SEM_DADOS = 2.0   # cada semana sem dados novos adianta a equipa este nº de horas
+SEMANAS_SEM_DADOS_MAX = 4          # teto (equipas nunca raspadas contam como este teto)
+HORAS_POR_NIVEL_LIGA = 3.0         # cada nível de PRIORIDADE_LIGAS adianta a equipa este nº de horas
+HORAS_SEM_HORARIO = 24.0           # jogo sem hora conhecida (ex.: "Adiado"): fim do dia
+# ================================
+
+_PRIORIDADES = {indice_ligas.normalizar(liga): peso for liga, peso in cfg.PRIORIDADE_LIGAS.items()}
+
+
+def prioridade_liga(liga):
+    return _PRIORIDADES.get(indice_ligas.normalizar(liga), cfg.PRIORIDADE_LIGA_PADRAO)
+
+
+def horas_de_inicio(conn, jogos_amanha):
+    """
+    {url da equipa -> hora "HH:MM" do seu primeiro jogo de amanhã}, pelos links que a fase 2
+    deixou no cache (também serve ao retomar, sem repetir a fase 2).
+    """
+    cache_links.inicializar_cache(conn)
+    cache_confrontos, cache_equipas = cache_links.carregar_cache(conn)
+    horas = {}
+    for jogo in jogos_amanha:
+        links = cache_links.links_do_cache(jogo, cache_confrontos, cache_equipas)
+        hora = jogo.get("hora") or ""
+        for url in links or ():
+            if url not in horas or hora < horas[url]:
+                horas[url] = hora
+    return horas
+
+
+def _horas_ate(dia, hora, agora):
+    try:
+        inicio = datetime.combine(dia, datetime.strptime(hora, "%H:%M").time())
+    except (TypeError, ValueError):
+        return HORAS_SEM_HORARIO
+    return max(0.0, (inicio - agora).total_seconds() / 3600)
+
+
+def _semanas_sem_dados(dia, marca):
+    try:
+        dias = (dia - date.fromisoformat(marca)).days
+    except (TypeError, ValueError):
+        return SEMANAS_SEM_DADOS_MAX
+    return min(SEMANAS_SEM_DADOS_MAX, max(0, dias) / 7)
+
+
+def ordenar_equipas(equipas, horas_inicio, marcas, dia, agora=None):
+    """
+    {url -> liga} reordenado por valor (ver o docstring do módulo). `marcas` são as de
+    banco.carregar_marcas_equipas; `dia` é o dia dos jogos (date ou "YYYY-MM-DD").
+    """
+    dia = date.fromisoformat(dia) if isinstance(dia, str) else dia
+    agora = agora or datetime.now()
+
+    def chave(item):
+        url, liga = item
+        return (_horas_ate(dia, horas_inicio.get(url), agora)
+                - HORAS_POR_SEMANA_SEM_DADOS * _semanas_sem_dados(dia, marcas.get(url))
+                - HORAS_POR_NIVEL_LIGA * (prioridade_liga(liga) - cfg.PRIORIDADE_LIGA_PADRAO))
+
+    ordenadas = dict(sorted(equipas.items(), key=chave))
+    if ordenadas:
+        primeira = next(iter(ordenadas))
+        log.info(f"[AGENDADOR] {len(ordenadas)} equipas ordenadas; primeira: {primeira} "
+                 f"(jogo às {horas_inicio.get(primeira) or '?'}, marca {marcas.get(primeira) or 'nenhuma'}).")
+    return ordenadas
+
+
+class Prazo:
+    """Orçamento de tempo (relógio de parede) partilhado pelos workers e pelo driver da fase 3."""
+
+    def __init__(self, minutos=ORCAMENTO_FASE3_MIN):
+        self.minutos = minutos
+        self.fim = None if minutos is None else time.monotonic() + 60 * minutos
+        self._avisado = False
+
+    def esgotado(self):
+        if self.fim is None or time.monotonic() < self.fim:
+            return False
+        if not self._avisado:
+            self._avisado = True
+            log.warning(f"[AGENDADOR] Orçamento de {self.minutos} min esgotado: sem novas equipas na fase 3.")
+        return True
@@ -0,0 +1,193 @@
+"""
+Arquivo das páginas brutas lidas do RedScore (agenda, confrontos, times).
+
+Cada HTML obtido é guardado comprimido (zstd, ou gzip sem o pacote zstandard) e endereçado
+pelo conteúdo: o nome do objeto é o SHA-256 do HTML, por isso a mesma página lida duas vezes
+ocupa um só objeto. Um índice SQLite próprio (fora de dados.db, para o arquivo poder ser
+copiado/movido sozinho e para não disputar o lock do escritor da fase 3) regista cada captura:
+
+    paginas/objetos/ab/abcdef....html.zst
+    paginas/indice.db   tabela 'capturas' (Data, Capturado_Em, Tipo, Url, Contexto, Objeto)
+
+`Contexto` é o que o parser precisa além do HTML: a data dos jogos (agenda) ou a liga do
+confronto que levou ao time (time). O reprocessamento offline está em reparse.py.
+"""
+import atexit
+import gzip
+import hashlib
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+
+import banco
+import metricas
+
+log = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    COMPRESSAO = "zstd"
+except ImportError:
+    zstandard = None
+    COMPRESSAO = "gzip"
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+ARQUIVAR_PAGINAS = True
+PASTA_ARQUIVO = "paginas"
+NIVEL_ZSTD = 10                    # o HTML repete muito: níveis médios já comprimem ~15-20x
+NIVEL_GZIP = 6
+CAPTURAS_POR_COMMIT = 100          # entradas do índice gravadas por transação
+PAGINAS_EM_ESPERA = 256            # páginas na fila do arquivo antes de as novas ficarem por arquivar
+# ================================
+
+EXTENSOES = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+def comprimir(html, formato=COMPRESSAO):
+    dados = html.encode("utf-8")
+    if formato == "zstd":
+        return zstandard.ZstdCompressor(level=NIVEL_ZSTD).compress(dados)
+    return gzip.compress(dados, compresslevel=NIVEL_GZIP)
+
+
+def ler_objeto(caminho):
+    """HTML de um objeto do arquivo (o formato vem da extensão)."""
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    if caminho.endswith(EXTENSOES["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"{caminho} está em zstd e o pacote zstandard não está instalado")
+        dados = zstandard.ZstdDecompressor().decompress(dados)
+    else:
+        dados = gzip.decompress(dados)
+    return dados.decode("utf-8")
+
+
+class ArquivoPaginas:
+    """
+    Guarda páginas a partir de qualquer thread (fase 2 asyncio, workers da fase 3, Selenium).
+    Quem busca só põe a página numa fila; uma thread de fundo calcula o resumo, comprime,
+    escreve o objeto e regista a captura no índice. Falhas do arquivo só ficam no log: nunca
+    interrompem a raspagem (com a fila cheia, a página fica por arquivar).
+    """
+
+    def __init__(self, pasta=PASTA_ARQUIVO, ativo=ARQUIVAR_PAGINAS, em_espera=PAGINAS_EM_ESPERA):
+        self.pasta = pasta
+        self.ativo = ativo
+        self._fila = queue.Queue(maxsize=em_espera)
+        self._thread = None
+        self._conn = None
+        self._pendentes = 0
+        self._lock = threading.Lock()
+
+    def _garantir_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._escritor, name="arquivo_paginas", daemon=True)
+                self._thread.start()
+
+    def _indice(self):
+        if self._conn is None:
+            os.makedirs(self.pasta, exist_ok=True)
+            self._conn = banco.conectar(os.path.join(self.pasta, "indice.db"), check_same_thread=False)
+            with self._conn:
+                self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS capturas (
+                    Id INTEGER PRIMARY KEY, Data TEXT NOT NULL, Capturado_Em TEXT NOT NULL,
+                    Tipo TEXT NOT NULL, Url TEXT NOT NULL, Contexto TEXT, Objeto TEXT NOT NULL
+                )""")
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_capturas_data ON capturas (Data, Tipo)")
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_capturas_url ON capturas (Url, Data)")
+        return self._conn
+
+    def caminho(self, objeto):
+        return os.path.join(self.pasta, "objetos", objeto)
+
+    def guardar(self, url, tipo, html, contexto=None):
+        """Põe o HTML de `url` ("agenda", "confronto" ou "time") na fila do arquivo; não bloqueia."""
+        if not self.ativo or not html:
+            return
+        self._garantir_thread()
+        try:
+            self._fila.put_nowait(("pagina", (url, tipo, html, contexto, datetime.now())))
+        except queue.Full:
+            log.warning(f"[ARQUIVO] Fila cheia: {url} fica por arquivar.")
+            metricas.registo.contar("arquivo_descartadas")
+
+    def _arquivar(self, url, tipo, html, contexto, agora):
+        try:
+            resumo = hashlib.sha256(html.encode("utf-8")).hexdigest()
+            objeto = os.path.join(resumo[:2], resumo + EXTENSOES[COMPRESSAO])
+            caminho = self.caminho(objeto)
+            if not os.path.exists(caminho):
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                temporario = f"{caminho}.tmp"
+                with open(temporario, "wb") as f:
+                    f.write(comprimir(html))
+                os.replace(temporario, caminho)
+            with self._lock:
+                conn = self._indice()
+                conn.execute(
+                    "INSERT INTO capturas (Data, Capturado_Em, Tipo, Url, Contexto, Objeto) VALUES (?, ?, ?, ?, ?, ?)",
+                    (agora.strftime("%Y-%m-%d"), agora.strftime("%Y-%m-%d %H:%M:%S"), tipo, url,
+                     None if contexto is None else str(contexto), objeto))
+                self._pendentes += 1
+                if self._pendentes >= CAPTURAS_POR_COMMIT:
+                    conn.commit()
+                    self._pendentes = 0
+        except Exception as e:
+            log.warning(f"[ARQUIVO] Não foi possível arquivar {url}: {e}")
+
+    def _escritor(self):
+        while True:
+            tipo, valor = self._fila.get()
+            if tipo == "pagina":
+                self._arquivar(*valor)
+            else:
+                valor.set()
+
+    def descarregar(self):
+        """Espera que todas as páginas já entregues a guardar() estejam no arquivo."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        feito = threading.Event()
+        self._fila.put(("descarregar", feito))
+        feito.wait()
+
+    def capturas(self, desde=None, ate=None, tipos=None):
+        """
+        Capturas entre `desde` e `ate` ("YYYY-MM-DD", inclusivos), da mais antiga para a mais
+        recente: lista de (Capturado_Em, Tipo, Url, Contexto, Objeto).
+        """
+        sql = "SELECT Capturado_Em, Tipo, Url, Contexto, Objeto FROM capturas WHERE Data >= ? AND Data <= ?"
+        parametros = [desde or "", ate or "9999"]
+        if tipos:
+            sql += f" AND Tipo IN ({', '.join('?' * len(tipos))})"
+            parametros += list(tipos)
+        self.descarregar()
+        with self._lock:
+            conn = self._indice()
+            conn.commit()
+            self._pendentes = 0
+            return conn.execute(sql + " ORDER BY Capturado_Em, Id", parametros).fetchall()
+
+    def fechar(self):
+        self.descarregar()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+                self._pendentes = 0
+
+
+# instância partilhada pelos scrapers
+arquivo = ArquivoPaginas()
+atexit.register(arquivo.fechar)
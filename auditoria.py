@@ -0,0 +1,94 @@
+import atexit
+import csv
+import logging
+import os
+import queue
+import threading
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+LIMITE_LINHAS_POR_ARQUIVO = 1000   # linhas em buffer por arquivo antes de escrever no disco
+# ================================
+
+
+class RegistoAuditoria:
+    """
+    Escritor dos CSVs de auditoria (ligas ignoradas, jogos incompletos, erros, ...).
+    As threads de raspagem só põem registos numa fila; uma thread de fundo guarda-os em
+    buffer por arquivo e escreve cada arquivo de uma vez (no fim da fase ou ao atingir o limite).
+    """
+
+    def __init__(self, limite=LIMITE_LINHAS_POR_ARQUIVO):
+        self.limite = limite
+        self._fila = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _garantir_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._escritor, name="auditoria", daemon=True)
+                self._thread.start()
+
+    def novo(self, caminho, cabecalho=None):
+        """Recomeça o arquivo (equivale a open(caminho, "w")), opcionalmente com cabeçalho."""
+        self._garantir_thread()
+        self._fila.put(("novo", caminho, cabecalho))
+
+    def registrar(self, caminho, linha):
+        """Acrescenta uma linha ao arquivo (equivale a open(caminho, "a") + writerow)."""
+        self._garantir_thread()
+        self._fila.put(("linha", caminho, list(linha)))
+
+    def descarregar(self):
+        """Escreve todos os buffers no disco e espera até terminar."""
+        if self._thread is None:
+            return
+        feito = threading.Event()
+        self._fila.put(("descarregar", None, feito))
+        feito.wait()
+
+    def _escritor(self):
+        buffers, truncar = {}, set()
+
+        def escrever(caminho):
+            linhas = buffers.pop(caminho, [])
+            modo = "w" if caminho in truncar else "a"
+            if not linhas and modo == "a":
+                return
+            try:
+                pasta = os.path.dirname(caminho)
+                if pasta:
+                    os.makedirs(pasta, exist_ok=True)
+                with open(caminho, modo, newline="", encoding="utf-8") as f:
+                    csv.writer(f).writerows(linhas)
+                truncar.discard(caminho)
+            except Exception as e:
+                log.error(f"[AUDITORIA] Falha ao escrever {caminho}: {e}")
+
+        while True:
+            tipo, caminho, valor = self._fila.get()
+            if tipo == "novo":
+                buffers[caminho] = [valor] if valor else []
+                truncar.add(caminho)
+            elif tipo == "linha":
+                linhas = buffers.setdefault(caminho, [])
+                linhas.append(valor)
+                if len(linhas) >= self.limite:
+                    escrever(caminho)
+            else:
+                for pendente in list(buffers) + list(truncar - set(buffers)):
+                    escrever(pendente)
+                valor.set()
+
+
+# instância partilhada pelo coletor e pelos scrapers
+registo = RegistoAuditoria()
+novo = registo.novo
+registrar = registo.registrar
+descarregar = registo.descarregar
+atexit.register(descarregar)
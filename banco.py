@@ -0,0 +1,200 @@
+import sqlite3
+import logging
+
+import pandas as pd
+
+import indice_jogos
+
+log = logging.getLogger(__name__)
+
+# ================================
+# Esquema: dimensões 'times'/'ligas' + factos 'jogos' (ids inteiros)
+# ================================
+# colunas da vista 'jogos_completos' (e dos DataFrames/CSV): o formato de sempre, com nomes
+CHAVE_JOGOS = ["Data", "Home", "Away"]
+COLUNAS_JOGOS = [
+    "Data", "Home", "Away", "Liga", "H_Gols_FT", "A_Gols_FT",
+    "H_Gols_HT", "A_Gols_HT", "H_Chute", "A_Chute",
+    "H_Chute_Gol", "A_Chute_Gol", "H_Ataques", "A_Ataques",
+    "H_Escanteios", "A_Escanteios", "Odd_H", "Odd_D", "Odd_A",
+]
+# colunas da tabela de factos 'jogos'
+CHAVE_FATOS = ["Data", "Home_Id", "Away_Id"]
+COLUNAS_ESTATISTICAS = COLUNAS_JOGOS[4:]
+COLUNAS_FATOS = CHAVE_FATOS + ["Liga_Id"] + COLUNAS_ESTATISTICAS
+
+PRAGMAS = {
+    "journal_mode": "WAL",      # leitores não bloqueiam o escritor e vice-versa
+    "synchronous": "NORMAL",    # seguro em WAL; evita fsync a cada commit
+    "temp_store": "MEMORY",
+    "cache_size": -32000,       # ~32 MB de page cache
+    "mmap_size": 134217728,     # 128 MB
+    "busy_timeout": 5000,
+}
+
+
+def conectar(nome_db, **kwargs):
+    """Abre a conexão da execução (uma por rotina) com WAL e pragmas afinados."""
+    conn = sqlite3.connect(nome_db, **kwargs)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma}={valor}")
+    return conn
+
+
+def nome_canonico(nome: str):
+    """Nome de equipa como é gravado em 'times': espaços colapsados, maiúsculas intactas."""
+    return " ".join(nome.split())
+
+
+def _criar_esquema(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS times (Id INTEGER PRIMARY KEY, Nome TEXT NOT NULL UNIQUE)")
+    conn.execute("CREATE TABLE IF NOT EXISTS ligas (Id INTEGER PRIMARY KEY, Nome TEXT NOT NULL UNIQUE)")
+    # Id INTEGER PRIMARY KEY: o rowid é estável (o VACUUM não o renumera) e ordena a exportação
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS jogos (
+        Id INTEGER PRIMARY KEY, Data TEXT NOT NULL,
+        Home_Id INTEGER NOT NULL REFERENCES times (Id), Away_Id INTEGER NOT NULL REFERENCES times (Id),
+        Liga_Id INTEGER REFERENCES ligas (Id), H_Gols_FT INTEGER, A_Gols_FT INTEGER,
+        H_Gols_HT INTEGER, A_Gols_HT INTEGER, H_Chute INTEGER, A_Chute INTEGER,
+        H_Chute_Gol INTEGER, A_Chute_Gol INTEGER, H_Ataques INTEGER, A_Ataques INTEGER,
+        H_Escanteios INTEGER, A_Escanteios INTEGER, Odd_H REAL, Odd_D REAL, Odd_A REAL,
+        UNIQUE (Home_Id, Data, Away_Id)
+    )""")
+    # histórico por equipa (casa: a própria chave única; fora) e por liga, ordenado por data
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jogos_away_data ON jogos (Away_Id, Data)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jogos_liga_data ON jogos (Liga_Id, Data)")
+    # compatibilidade: mesmas colunas (e ordem) da antiga tabela 'jogos' e do CSV exportado
+    conn.execute(f"""
+    CREATE VIEW IF NOT EXISTS jogos_completos AS
+    SELECT j.Id, j.Data, h.Nome AS Home, a.Nome AS Away, l.Nome AS Liga,
+        {", ".join(f"j.{c}" for c in COLUNAS_ESTATISTICAS)}
+    FROM jogos j
+    JOIN times h ON h.Id = j.Home_Id
+    JOIN times a ON a.Id = j.Away_Id
+    LEFT JOIN ligas l ON l.Id = j.Liga_Id""")
+
+
+def _migrar_jogos_v1(conn):
+    """'jogos' antigo (nomes em texto, chave (Data, Home, Away)) -> dimensões + factos."""
+    log.info("[DB] A migrar 'jogos' para o esquema com dimensões times/ligas...")
+    conn.execute("ALTER TABLE jogos RENAME TO jogos_v1")
+    _criar_esquema(conn)
+    conn.execute("INSERT OR IGNORE INTO times (Nome) SELECT Home FROM jogos_v1 UNION SELECT Away FROM jogos_v1")
+    conn.execute("INSERT OR IGNORE INTO ligas (Nome) SELECT DISTINCT Liga FROM jogos_v1 WHERE Liga IS NOT NULL")
+    # pela ordem de inserção original: a exportação continua na mesma ordem
+    conn.execute(f"""
+    INSERT OR IGNORE INTO jogos ({", ".join(COLUNAS_FATOS)})
+    SELECT v.Data, h.Id, a.Id, l.Id, {", ".join(f"v.{c}" for c in COLUNAS_ESTATISTICAS)}
+    FROM jogos_v1 v
+    JOIN times h ON h.Nome = v.Home
+    JOIN times a ON a.Nome = v.Away
+    LEFT JOIN ligas l ON l.Nome = v.Liga
+    ORDER BY v.rowid""")
+    conn.execute("DROP TABLE jogos_v1")
+    # as marcas de exportação apontavam para os rowids antigos: a próxima exportação é completa
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'exportacoes'").fetchone():
+        conn.execute("DELETE FROM exportacoes")
+    log.info(f"[DB] Migração concluída ({conn.execute('SELECT COUNT(*) FROM jogos').fetchone()[0]} jogos).")
+
+
+def inicializar_banco(conn):
+    colunas = {row[1] for row in conn.execute("PRAGMA table_info(jogos)")}
+    with conn:
+        conn.execute("BEGIN")   # a migração (DDL incluído) é tudo ou nada
+        if "Home" in colunas:
+            _migrar_jogos_v1(conn)
+        else:
+            _criar_esquema(conn)
+        # marca por equipa: data do jogo mais recente já gravado a partir da página do time
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS marcas_equipas (
+            Url TEXT PRIMARY KEY, Ultima_Data TEXT, Atualizado_Em TEXT
+        )""")
+
+
+def _sql_upsert_jogos():
+    valores = [c for c in COLUNAS_FATOS if c not in CHAVE_FATOS]
+    # o WHERE evita reescrever (e contar como alterada) uma linha idêntica à existente
+    return f"""
+    INSERT INTO jogos ({", ".join(COLUNAS_FATOS)})
+    VALUES ({", ".join("?" * len(COLUNAS_FATOS))})
+    ON CONFLICT({", ".join(CHAVE_FATOS)}) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in valores)}
+    WHERE {" OR ".join(f"jogos.{c} IS NOT excluded.{c}" for c in valores)}"""
+
+
+SQL_UPSERT_JOGOS = _sql_upsert_jogos()
+
+
+def ids_dimensao(conn, tabela, nomes):
+    """{nome -> Id} na dimensão 'times' ou 'ligas', criando os nomes que ainda não existem."""
+    nomes = [nome for nome in set(nomes) if isinstance(nome, str)]
+    conn.executemany(f"INSERT OR IGNORE INTO {tabela} (Nome) VALUES (?)", [(nome,) for nome in nomes])
+    ids = {}
+    for i in range(0, len(nomes), 500):
+        lote = nomes[i:i + 500]
+        ids.update(conn.execute(
+            f"SELECT Nome, Id FROM {tabela} WHERE Nome IN ({','.join('?' * len(lote))})", lote))
+    return ids
+
+
+def upsert_jogos(conn, df):
+    """
+    Grava o DataFrame (colunas COLUNAS_JOGOS, com nomes) em 'jogos': resolve/cria os ids de
+    times e ligas e faz INSERT ... ON CONFLICT DO UPDATE, tudo numa única transação.
+    Retorna (inseridos, atualizados).
+    """
+    if df.empty:
+        return 0, 0
+    ultimo_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM jogos").fetchone()[0]
+    with conn:
+        times = ids_dimensao(conn, "times", pd.concat([df["Home"], df["Away"]]).unique())
+        ligas = ids_dimensao(conn, "ligas", df["Liga"].unique())
+        fatos = df.assign(Home_Id=df["Home"].map(times), Away_Id=df["Away"].map(times),
+                          Liga_Id=df["Liga"].map(ligas))[COLUNAS_FATOS]
+        fatos = fatos.astype("object").where(fatos.notna(), None)
+        # rowcount soma as linhas inseridas/alteradas em 'jogos' (as das dimensões não contam)
+        alteradas = conn.executemany(SQL_UPSERT_JOGOS, fatos.itertuples(index=False, name=None)).rowcount
+    inseridos = conn.execute(
+        "SELECT COUNT(*) FROM jogos WHERE rowid > ?", (ultimo_rowid,)).fetchone()[0]
+    return inseridos, alteradas - inseridos
+
+
+def carregar_jogos_existentes(conn, desde=None, linhas_por_bloco=50000):
+    """
+    Índice compacto (IndiceJogos) das chaves (Data, Home, Away) já gravadas; com `desde`,
+    apenas jogos a partir dessa data. Lido em blocos: as strings nunca estão todas em memória.
+    """
+    indice = indice_jogos.IndiceJogos()
+    if desde:
+        blocos = pd.read_sql_query("SELECT Data, Home, Away FROM jogos_completos WHERE Data >= ?", conn,
+                                   params=(desde,), chunksize=linhas_por_bloco)
+    else:
+        blocos = pd.read_sql_query("SELECT Data, Home, Away FROM jogos_completos", conn, chunksize=linhas_por_bloco)
+    for bloco in blocos:
+        indice.adicionar(bloco)
+    return indice
+
+
+def carregar_marcas_equipas(conn, urls):
+    """Retorna {url -> Ultima_Data} apenas para as equipas indicadas."""
+    urls = list(urls)
+    marcas = {}
+    for i in range(0, len(urls), 500):
+        lote = urls[i:i + 500]
+        marcas.update(conn.execute(
+            f"SELECT Url, Ultima_Data FROM marcas_equipas WHERE Url IN ({','.join('?' * len(lote))})", lote))
+    return marcas
+
+
+def atualizar_marcas_equipas(conn, marcas, agora):
+    """Grava as novas marcas (só avança: mantém a maior data entre a atual e a nova)."""
+    if not marcas:
+        return
+    with conn:
+        conn.executemany("""
+            INSERT INTO marcas_equipas (Url, Ultima_Data, Atualizado_Em) VALUES (?, ?, ?)
+            ON CONFLICT(Url) DO UPDATE SET
+                Ultima_Data = MAX(Ultima_Data, excluded.Ultima_Data),
+                Atualizado_Em = excluded.Atualizado_Em""",
+            [(url, data, agora) for url, data in marcas.items()])
@@ -0,0 +1,287 @@
+"""
+Benchmark offline dos caminhos quentes do coletor (sem rede nem browser).
+
+Uso:
+    python benchmark.py                         # escalas 1x, 10x, 100x
+    python benchmark.py --escalas 1 10 --repeticoes 5
+    python benchmark.py --gravar base.json      # guarda os resultados como referência
+    python benchmark.py --comparar base.json    # compara com uma referência gravada
+
+As páginas vêm de fixtures_benchmark/ (agenda.html, time.html, confronto.html), por exemplo
+um snapshot_amanha.html copiado para lá; as que faltarem são geradas com a mesma estrutura
+que os scrapers leem. As páginas de time e de confronto são servidas por um servidor HTTP
+local, para exercitar o caminho requests real. O banco é sempre uma cópia de dados.db.
+"""
+import argparse
+import http.server
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+import requests
+
+import arquivo_paginas
+import auditoria
+import banco
+import concorrencia
+import consultas
+import data as dt
+import exportacao
+import ligas_config as cfg
+
+PASTA_FIXTURES = "fixtures_benchmark"
+NOME_DB = "dados.db"
+JOGOS_POR_LIGA = 8
+LINHAS_POR_TIME = 50
+RUIDO_POR_PAGINA = 400             # blocos sem interesse (menus, anúncios) por página gerada
+
+
+# ================================
+# Fixtures
+# ================================
+def _ruido(n):
+    return "".join(f"<div class='ad-slot'><p>publicidade {i}</p><img src='/img/{i}.png'></div>"
+                   for i in range(n))
+
+
+def _gerar_agenda(escala):
+    ligas = sorted(cfg.LIGAS_PERMITIDAS) + [f"Ignorada - Liga {i}" for i in range(10)]
+    blocos, k = [], 0
+    for _ in range(escala):
+        for liga in ligas:
+            pais, nome = liga.split(" - ", 1)
+            jogos = []
+            for _ in range(JOGOS_POR_LIGA):
+                k += 1
+                tds = ["<td></td>", "<td>15:00</td>",
+                       f"<td><a href='/pt-br/futebol/jogo/{k}'><span class='team'>Casa {k}</span></a></td>",
+                       "<td>-</td>", f"<td><span class='team'>Fora {k}</span></td>"]
+                tds += ["<td></td>"] * 9 + ["<td>2.10</td>", "<td>3.25</td>", "<td>3.60</td>"]
+                jogos.append(f"<tbody id='xmatch_{k}'><tr>{''.join(tds)}</tr></tbody>")
+            blocos.append(
+                f"<div id='league_{k}'><span class='d-block d-md-inline'>{pais}</span>"
+                f"<span class='font-bold'>{nome}</span><table>{''.join(jogos)}</table></div>")
+    return f"<html><body>{_ruido(RUIDO_POR_PAGINA)}{''.join(blocos)}</body></html>"
+
+
+def _gerar_time(linhas=LINHAS_POR_TIME):
+    hoje = date.today()
+    ligas = ["Serie A", "Premier League", "Copa Desconhecida"]
+    corpo = []
+    for i in range(linhas):
+        dia = (hoje - timedelta(days=7 * (i + 1))).strftime("%Y-%m-%d")
+        corpo.append(
+            f"<tr><td>{dia}</td><td><img alt='{ligas[i % 3]}'></td><td>Time A</td><td>2 - 1</td>"
+            f"<td>Adversário {i}</td><td>1 - 0</td><td>12 - 7</td><td>5 - 2</td><td>60 - 41</td>"
+            f"<td>6 - 3</td><td></td><td>1.85</td><td>3.40</td><td>4.20</td></tr>")
+    return (f"<html><body>{_ruido(RUIDO_POR_PAGINA)}<div class='match-grid__bottom'><table><tbody>"
+            f"{''.join(corpo)}</tbody></table></div></body></html>")
+
+
+def _gerar_confronto():
+    return (f"<html><body>{_ruido(RUIDO_POR_PAGINA)}<div class='match-detail__teams'>"
+            "<div class='match-detail__name'><a href='/pt-br/futebol/time/casa'>Casa</a></div>"
+            "<div class='match-detail__name'><a href='/pt-br/futebol/time/fora'>Fora</a></div>"
+            "</div></body></html>")
+
+
+def carregar_fixture(nome, gerador):
+    caminho = os.path.join(PASTA_FIXTURES, nome)
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            return f.read(), "gravada"
+    return gerador(), "gerada"
+
+
+# ================================
+# Stand-ins offline (servidor HTTP local e driver)
+# ================================
+class _Handler(http.server.BaseHTTPRequestHandler):
+    paginas = {}
+
+    def do_GET(self):
+        corpo = self.paginas.get(self.path.split("?")[0], "").encode("utf-8")
+        self.send_response(200 if corpo else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_servidor(paginas):
+    _Handler.paginas = paginas
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+class DriverFixture:
+    """O mínimo da API do WebDriver que os scrapers usam: get, page_source e find_element(s)."""
+
+    def __init__(self, html):
+        self.page_source = html
+
+    def get(self, url):
+        pass
+
+    def find_element(self, *args):
+        return True
+
+    def find_elements(self, *args):
+        return [True]
+
+    def execute_script(self, *args):
+        return "complete"
+
+
+# ================================
+# Medição
+# ================================
+def medir(funcao, repeticoes, preparar=None):
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos)}
+
+
+def _linhas_jogos(n):
+    """n linhas no formato da tabela 'jogos', com chaves que não existem no banco."""
+    return pd.DataFrame({
+        "Data": [f"2099-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(n)],
+        "Home": [f"Casa {i}" for i in range(n)], "Away": [f"Fora {i}" for i in range(n)],
+        "Liga": "Brasil - Serie A",
+        **{c: 1 for c in banco.COLUNAS_JOGOS[4:16]},
+        "Odd_H": 1.85, "Odd_D": 3.4, "Odd_A": 4.2,
+    })[banco.COLUNAS_JOGOS]
+
+
+def executar(escalas, repeticoes):
+    resultados = {}
+    agenda_base, origem_agenda = carregar_fixture("agenda.html", lambda: _gerar_agenda(1))
+    html_time, origem_time = carregar_fixture("time.html", _gerar_time)
+    html_confronto, origem_confronto = carregar_fixture("confronto.html", _gerar_confronto)
+    print(f"Fixtures: agenda={origem_agenda}, time={origem_time}, confronto={origem_confronto}")
+
+    servidor, base_url = iniciar_servidor({"/time": html_time, "/confronto": html_confronto})
+    session = requests.Session()
+    # mede o parsing, não o ritmo imposto ao RedScore: controlador sem intervalo entre pedidos
+    concorrencia.redscore = concorrencia.ControladorAIMD(intervalo_min_s=0)
+    # nem o arquivo de páginas: a thread de fundo (SHA-256, compressão, índice) entraria nas medições
+    arquivar = arquivo_paginas.arquivo.ativo
+    arquivo_paginas.arquivo.ativo = False
+    pasta = tempfile.mkdtemp(prefix="bench_redscore_")
+    cwd = os.getcwd()
+    db_origem = os.path.abspath(NOME_DB)
+    os.chdir(pasta)  # os scrapers escrevem CSVs de auditoria no diretório atual
+    try:
+        jogos_time = dt.extrair_jogos_time(
+            html_time, "time", "Brasil - Serie A", set(), cfg.LIGAS_PERMITIDAS)
+        for escala in escalas:
+            r = resultados[f"{escala}x"] = {}
+            # agenda gravada: a página é a mesma, a escala repete a leitura
+            if origem_agenda == "gravada":
+                driver, leituras = DriverFixture(agenda_base), escala
+            else:
+                driver, leituras = DriverFixture(agenda_base if escala == 1 else _gerar_agenda(escala)), 1
+            r["raspar_jogos_de_amanha"] = medir(lambda: [
+                dt.raspar_jogos_de_amanha(driver, cfg.LIGAS_PERMITIDAS) for _ in range(leituras)], repeticoes)
+
+            n_times = 10 * escala
+            r["raspar_dados_time (HTTP local)"] = medir(lambda: [
+                dt.raspar_dados_time_por_requests(
+                    session, f"{base_url}/time", "Brasil - Serie A", set(), cfg.LIGAS_PERMITIDAS)
+                for _ in range(n_times)], repeticoes)
+            r["extrair_links_equipes (HTTP local)"] = medir(lambda: [
+                dt.extrair_links_equipes(session.get(f"{base_url}/confronto").text)
+                for _ in range(n_times)], repeticoes)
+
+            brutos = (jogos_time or []) * (20 * escala)
+            r[f"processar_dados_raspados ({len(brutos)} linhas)"] = medir(
+                lambda: dt.processar_dados_raspados(brutos), repeticoes)
+
+            db = os.path.join(pasta, NOME_DB)
+            df = _linhas_jogos(1000 * escala)
+            estado = {}
+
+            def copiar_db():
+                anterior = estado.pop("conn", None)
+                if anterior:
+                    anterior.close()
+                for sufixo in ("", "-wal", "-shm"):
+                    if os.path.exists(db + sufixo):
+                        os.remove(db + sufixo)
+                shutil.copy(db_origem, db)
+                estado["conn"] = banco.conectar(db)
+                banco.inicializar_banco(estado["conn"])
+                consultas.inicializar_consultas(estado["conn"])
+                exportacao.inicializar_exportacoes(estado["conn"])
+
+            r[f"salvar_no_banco/upsert ({len(df)} linhas)"] = medir(
+                lambda: banco.upsert_jogos(estado["conn"], df), repeticoes, preparar=copiar_db)
+            r["carregar_jogos_existentes (índice)"] = medir(
+                lambda: banco.carregar_jogos_existentes(estado["conn"]), repeticoes)
+            r["exportar_para_csv (completo)"] = medir(
+                lambda: exportacao.exportar_csv(estado["conn"], "dados.csv", completo=True), repeticoes)
+            r[f"exportar_para_csv (incremental, {len(df)} linhas)"] = medir(
+                lambda: exportacao.exportar_csv(estado["conn"], "dados.csv"), repeticoes,
+                preparar=lambda: (copiar_db(),
+                                  exportacao.exportar_csv(estado["conn"], "dados.csv"),
+                                  banco.upsert_jogos(estado["conn"], df)))
+            estado["conn"].close()
+    finally:
+        auditoria.descarregar()
+        arquivo_paginas.arquivo.fechar()
+        arquivo_paginas.arquivo.ativo = arquivar
+        os.chdir(cwd)
+        servidor.shutdown()
+        shutil.rmtree(pasta, ignore_errors=True)
+    return resultados
+
+
+def imprimir(resultados, referencia=None):
+    for escala, medidas in resultados.items():
+        print(f"\n== {escala} ==")
+        for nome, m in medidas.items():
+            linha = f"  {nome:<55} {m['mediana_s'] * 1000:10.1f} ms"
+            base = (referencia or {}).get(escala, {}).get(nome)
+            if base:
+                linha += f"   ({m['mediana_s'] / base['mediana_s']:.2f}x da referência)"
+            print(linha)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--gravar", help="grava os resultados em JSON (referência)")
+    parser.add_argument("--comparar", help="JSON de referência gravado com --gravar")
+    args = parser.parse_args(argv)
+
+    referencia = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            referencia = json.load(f)
+    resultados = executar(args.escalas, args.repeticoes)
+    imprimir(resultados, referencia)
+    if args.gravar:
+        with open(args.gravar, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
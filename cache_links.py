@@ -0,0 +1,70 @@
+import logging
+from datetime import datetime, timedelta
+
+log = logging.getLogger(__name__)
+
+
+# ================================
+# Cache persistente de links (dados.db)
+# ================================
+def inicializar_cache(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cache_confrontos (
+        Link_Confronto TEXT PRIMARY KEY, Home_Url TEXT, Away_Url TEXT, Atualizado_Em TEXT
+    )""")
+    # Nome + Liga: o mesmo nome de clube pode existir em países diferentes
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cache_equipas (
+        Nome TEXT, Liga TEXT, Url TEXT, Atualizado_Em TEXT,
+        PRIMARY KEY (Nome, Liga)
+    )""")
+    conn.commit()
+
+
+def expurgar_cache(conn, ttl_dias):
+    """Remove entradas mais antigas que `ttl_dias` (serão resolvidas de novo pela rede)."""
+    limite = (datetime.now() - timedelta(days=ttl_dias)).strftime("%Y-%m-%d %H:%M:%S")
+    removidos = conn.execute(
+        "DELETE FROM cache_confrontos WHERE Atualizado_Em < ?", (limite,)).rowcount
+    removidos += conn.execute(
+        "DELETE FROM cache_equipas WHERE Atualizado_Em < ?", (limite,)).rowcount
+    conn.commit()
+    if removidos:
+        log.info(f"[CACHE] {removidos} entradas expiradas removidas (TTL={ttl_dias} dias).")
+
+
+def carregar_cache(conn):
+    """Retorna (confrontos, equipas): {link -> (home_url, away_url)} e {(nome, liga) -> url}."""
+    confrontos = {link: (home, away) for link, home, away in conn.execute(
+        "SELECT Link_Confronto, Home_Url, Away_Url FROM cache_confrontos")}
+    equipas = {(nome, liga): url for nome, liga, url in conn.execute(
+        "SELECT Nome, Liga, Url FROM cache_equipas")}
+    return confrontos, equipas
+
+
+def links_do_cache(jogo, confrontos, equipas):
+    """Resolve (home_url, away_url) de um jogo da agenda pelo cache, ou None se não houver."""
+    links = confrontos.get(jogo['link_confronto'])
+    if links:
+        return links
+    home = equipas.get((jogo['home'], jogo['liga']))
+    away = equipas.get((jogo['away'], jogo['liga']))
+    if home and away:
+        return home, away
+    return None
+
+
+def gravar_no_cache(conn, resolvidos):
+    """Grava uma lista de (jogo, home_url, away_url) resolvidos pela rede ou pelo Selenium."""
+    if not resolvidos:
+        return
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO cache_confrontos VALUES (?, ?, ?, ?)",
+            [(j['link_confronto'], home, away, agora) for j, home, away in resolvidos])
+        conn.executemany(
+            "INSERT OR REPLACE INTO cache_equipas VALUES (?, ?, ?, ?)",
+            [(nome, j['liga'], url, agora) for j, home, away in resolvidos
+             for nome, url in ((j['home'], home), (j['away'], away))])
+    log.info(f"[CACHE] {len(resolvidos)} confrontos gravados no cache.")
@@ -0,0 +1,125 @@
+import json
+import logging
+import threading
+from datetime import datetime
+
+import banco
+
+log = logging.getLogger(__name__)
+
+# fases gravadas em checkpoint_execucao.Fase
+FASE_AGENDA, FASE_LINKS, FASE_GRAVACAO = 1, 2, 4
+
+
+def inicializar_checkpoint(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS checkpoint_execucao (
+        Dia TEXT PRIMARY KEY, Fase INTEGER, Atualizado_Em TEXT
+    )""")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS checkpoint_agenda (
+        Dia TEXT, Ordem INTEGER, Jogo TEXT, PRIMARY KEY (Dia, Ordem)
+    )""")
+    # Concluida=1 só depois de os jogos da equipa estarem gravados em 'jogos'
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS checkpoint_equipas (
+        Dia TEXT, Url TEXT, Liga TEXT, Concluida INTEGER DEFAULT 0,
+        PRIMARY KEY (Dia, Url)
+    )""")
+    conn.commit()
+
+
+class Checkpoint:
+    """
+    Progresso de uma execução (identificada pelo dia da agenda), gravado em dados.db:
+    agenda da fase 1, links das equipas da fase 2 e, na fase 3, as equipas cujos jogos já
+    foram gravados. Com `retomar`, continua a execução interrompida mais recente, mesmo que seja
+    de outro dia da agenda (ex.: caiu antes da meia-noite e é retomada depois): `dia` passa a
+    ser o dela, e o trabalho já concluído é saltado. Tem conexão própria, partilhável entre threads.
+    """
+
+    TABELAS = ("checkpoint_agenda", "checkpoint_equipas", "checkpoint_execucao")
+
+    def __init__(self, nome_db, dia):
+        self.dia = dia
+        self._conn = banco.conectar(nome_db, check_same_thread=False)
+        self._lock = threading.Lock()
+        inicializar_checkpoint(self._conn)
+
+    def fechar(self):
+        self._conn.close()
+
+    def iniciar(self, retomar=False):
+        """Retorna a última fase concluída a retomar (0 = começar do início)."""
+        with self._lock, self._conn:
+            if retomar:
+                row = self._conn.execute(
+                    "SELECT Dia FROM checkpoint_execucao WHERE Fase < ? ORDER BY Atualizado_Em DESC, Dia DESC LIMIT 1",
+                    (FASE_GRAVACAO,)).fetchone()
+                if row and row[0] != self.dia:
+                    log.info(f"[CHECKPOINT] Execução interrompida encontrada para {row[0]} (em vez de {self.dia}).")
+                    self.dia = row[0]
+            # execuções de outros dias já não servem: a agenda mudou
+            for tabela in self.TABELAS:
+                self._conn.execute(f"DELETE FROM {tabela} WHERE Dia != ?", (self.dia,))
+            if not retomar:
+                for tabela in self.TABELAS:
+                    self._conn.execute(f"DELETE FROM {tabela} WHERE Dia = ?", (self.dia,))
+            row = self._conn.execute(
+                "SELECT Fase FROM checkpoint_execucao WHERE Dia = ?", (self.dia,)).fetchone()
+        fase = row[0] if row else 0
+        if retomar:
+            log.info(f"[CHECKPOINT] A retomar a execução de {self.dia} após a fase {fase}.")
+        return fase
+
+    def _concluir_fase(self, fase):
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._conn.execute("INSERT OR REPLACE INTO checkpoint_execucao VALUES (?, ?, ?)",
+                           (self.dia, fase, agora))
+
+    # --- fase 1 ---
+    def gravar_agenda(self, jogos):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoint_agenda WHERE Dia = ?", (self.dia,))
+            self._conn.executemany(
+                "INSERT INTO checkpoint_agenda VALUES (?, ?, ?)",
+                [(self.dia, i, json.dumps(jogo, default=str, ensure_ascii=False))
+                 for i, jogo in enumerate(jogos)])
+            self._concluir_fase(FASE_AGENDA)
+
+    def carregar_agenda(self):
+        with self._lock:
+            return [json.loads(jogo) for (jogo,) in self._conn.execute(
+                "SELECT Jogo FROM checkpoint_agenda WHERE Dia = ? ORDER BY Ordem", (self.dia,))]
+
+    # --- fase 2 ---
+    def gravar_equipas(self, equipas_a_visitar):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO checkpoint_equipas (Dia, Url, Liga) VALUES (?, ?, ?)",
+                [(self.dia, url, liga) for url, liga in equipas_a_visitar.items()])
+            self._concluir_fase(FASE_LINKS)
+
+    def carregar_equipas(self, so_pendentes=False):
+        """{url -> liga} das equipas da execução (ou só das que ainda não terminaram)."""
+        sql = "SELECT Url, Liga FROM checkpoint_equipas WHERE Dia = ?"
+        if so_pendentes:
+            sql += " AND Concluida = 0"
+        with self._lock:
+            return dict(self._conn.execute(sql + " ORDER BY rowid", (self.dia,)))
+
+    # --- fase 3 ---
+    def concluir_equipas(self, urls):
+        """Marca as equipas como concluídas (chamar só depois de os jogos delas estarem gravados)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE checkpoint_equipas SET Concluida = 1 WHERE Dia = ? AND Url = ?",
+                [(self.dia, url) for url in urls])
+
+    # --- fase 4 ---
+    def finalizar(self):
+        """No fim da fase 4: descarta o progresso e deixa a execução como concluída."""
+        with self._lock, self._conn:
+            for tabela in ("checkpoint_agenda", "checkpoint_equipas"):
+                self._conn.execute(f"DELETE FROM {tabela} WHERE Dia = ?", (self.dia,))
+            self._concluir_fase(FASE_GRAVACAO)
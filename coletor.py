@@ -1,29 +1,50 @@
 import pandas as pd
 import data as dt
+import agendador
+import http_async
+import cache_links
+import agenda
+import arquivo_paginas
+import banco
+import exportacao
+import historico_odds
+import auditoria
+import checkpoint
+import concorrencia
+import consultas
+import gravacao
+import metricas
+import parsing_paralelo
+import navegador
 from datetime import date, timedelta, datetime
 import ligas_config as cfg
 import os
 import logging
-import sqlite3
-import random
 import time
+import queue
+import threading
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from auth_redscore import REDSCORE_USER, REDSCORE_PASS
-from login_redscore import login_redscore
 import requests
-from urllib.parse import urljoin
 import warnings
+import argparse
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 # ================================
 # CONFIGURÁVEL
 # ================================
-MAX_WORKERS_FASE2 = 10             # número de threads para fase 2 (requests)
+POOL_CONEXOES_FASE2 = 20           # tamanho do pool de conexões keep-alive da fase 2
 REQUEST_TIMEOUT = 20               # timeout para requests
+MAX_WORKERS_FASE3 = concorrencia.CONCORRENCIA_MAXIMA  # threads HTTP da fase 3 (0 = apenas driver sequencial)
+                                   # os pedidos simultâneos (fases 2 e 3) são decididos por concorrencia.redscore
+CACHE_TTL_DIAS = 30                # validade das entradas do cache de links (dados.db)
 VACUUM_SIZE_THRESHOLD_MB = 50      # força VACUUM se DB > isto (MB)
 VACUUM_DAY_IS_SUNDAY = True        # ou False se preferir apenas pelo tamanho
+EXPORT_CSV_COMPLETO = False        # True reescreve o CSV inteiro todas as noites (em blocos)
+EXPORT_PARQUET = None              # ex.: "dados_redscore.parquet" para snapshot Parquet (requer pyarrow)
+PASTA_RELATORIOS = "relatorios"    # relatório JSON de cada execução (tempos, latências, fallbacks)
+RELATORIO_PROMETHEUS = None        # ex.: "/var/lib/node_exporter/redscore.prom" (textfile collector)
 # ================================
 
 
@@ -33,59 +54,43 @@ VACUUM_DAY_IS_SUNDAY = True        # ou False se preferir apenas pelo tamanho
 dia = date.today() + timedelta(days=1)
 NOME_DB = "dados.db"
 
-logging.basicConfig(
-    filename="coletor.log",
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-)
+# os processos de parsing reimportam este módulo (como __mp_main__): a configuração do log e o
+# login ficam fora do import (ver o bloco __main__ e autenticar())
 log = logging.getLogger(__name__)
-log.info("Coletor iniciado")
 
 
-# ================================
-# DB utils
-# ================================
-def inicializar_banco(nome_db=NOME_DB):
-    conn = sqlite3.connect(nome_db)
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS jogos (
-        Data TEXT, Home TEXT, Away TEXT, Liga TEXT, H_Gols_FT INTEGER, A_Gols_FT INTEGER,
-        H_Gols_HT INTEGER, A_Gols_HT INTEGER, H_Chute INTEGER, A_Chute INTEGER,
-        H_Chute_Gol INTEGER, A_Chute_Gol INTEGER, H_Ataques INTEGER, A_Ataques INTEGER,
-        H_Escanteios INTEGER, A_Escanteios INTEGER, Odd_H REAL, Odd_D REAL, Odd_A REAL,
-        PRIMARY KEY (Data, Home, Away)
-    )""")
-    conn.commit()
-    conn.close()
-
-
-def salvar_no_banco(df, nome_db=NOME_DB):
-    if df.empty:
-        return
-    conn = sqlite3.connect(nome_db)
-    df.to_sql('jogos', conn, if_exists='append', index=False)
-    conn.close()
-    log.info(f"Dados salvos/atualizados na tabela 'jogos' ({len(df)} linhas).")
+def configurar_logging():
+    logging.basicConfig(
+        filename="coletor.log",
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+    log.info("Coletor iniciado")
 
 
-def carregar_jogos_existentes(nome_db=NOME_DB):
-    if not os.path.exists(nome_db):
-        return set()
-    conn = sqlite3.connect(nome_db)
-    jogos = {tuple(row) for row in conn.cursor().execute(
-        "SELECT Data, Home, Away FROM jogos")}
-    conn.close()
-    return jogos
+def autenticar():
+    """Driver do Selenium com sessão iniciada no RedScore."""
+    from auth_redscore import REDSCORE_USER, REDSCORE_PASS
+    from login_redscore import login_redscore
+    return navegador.aplicar_bloqueios(login_redscore(REDSCORE_USER, REDSCORE_PASS))
 
 
-def exportar_para_csv(nome_db=NOME_DB, nome_csv="dados_redscore.csv"):
-    conn = sqlite3.connect(nome_db)
-    df = pd.read_sql_query("SELECT * FROM jogos", conn)
-    conn.close()
-    df.to_csv(nome_csv, index=False)
-    print(f"✅ Histórico completo exportado para {nome_csv} ({len(df)} linhas)")
-    log.info(f"Exportado histórico para {nome_csv} ({len(df)} linhas)")
+# ================================
+# DB utils
+# ================================
+def exportar_para_csv(conn, nome_csv="dados_redscore.csv", completo=EXPORT_CSV_COMPLETO, nome_parquet=EXPORT_PARQUET):
+    """Acrescenta ao CSV só as linhas novas desde a última exportação (ou reescreve tudo com `completo`)."""
+    with metricas.registo.cronometro("db"):
+        linhas, completo = exportacao.exportar_csv(conn, nome_csv, completo=completo)
+    if completo:
+        print(f"✅ Histórico completo exportado para {nome_csv} ({linhas} linhas)")
+        log.info(f"Exportado histórico para {nome_csv} ({linhas} linhas)")
+    else:
+        print(f"✅ {linhas} linhas novas acrescentadas a {nome_csv}")
+        log.info(f"Exportação incremental para {nome_csv} ({linhas} linhas novas)")
+    if nome_parquet:
+        linhas = exportacao.exportar_parquet(conn, nome_parquet)
+        log.info(f"Snapshot Parquet exportado para {nome_parquet} ({linhas} linhas)")
 
 
 def exportar_jogos_amanha_para_csv(lista_de_jogos, nome_csv=f"jogos_do_dia/Jogos_do_Dia_RedScore_{dia}.csv"):
@@ -102,18 +107,18 @@ def exportar_jogos_amanha_para_csv(lista_de_jogos, nome_csv=f"jogos_do_dia/Jogos
 # ================================
 # VACUUM policy
 # ================================
-def maybe_vacuum_db(nome_db=NOME_DB):
+def maybe_vacuum_db(conn, nome_db=NOME_DB):
     try:
         size_mb = os.path.getsize(nome_db) / (1024 * 1024)
         today_is_sunday = datetime.today().weekday() == 6
         if size_mb >= VACUUM_SIZE_THRESHOLD_MB or (VACUUM_DAY_IS_SUNDAY and today_is_sunday):
             log.info(f"[DB] Executando VACUUM (tamanho={size_mb:.1f} MB).")
-            conn = sqlite3.connect(nome_db)
             conn.execute("VACUUM;")
-            conn.close()
             log.info("[DB] VACUUM concluído.")
+            return True
     except Exception as e:
         log.warning(f"[DB] Não foi possível executar VACUUM: {e}")
+    return False
 
 
 # ================================
@@ -148,191 +153,451 @@ def fetch_match_links_by_requests(session, match_url):
     Se o HTML não contiver os anchors esperados, retorna (None, None) para identificar fallback.
     """
     try:
-        resp = session.get(match_url, timeout=REQUEST_TIMEOUT)
+        with concorrencia.redscore.pedido() as pedido:
+            resp = session.get(match_url, timeout=REQUEST_TIMEOUT)
+            pedido.resposta(resp)
         if resp.status_code != 200 or not resp.text:
             return None, None
-        # usando BeautifulSoup do data.py (alias)
-        soup = dt.BeautifulSoup(resp.text, 'html.parser')
-        # tenta os seletores robustos
-        anchors = soup.select(
-            "div.match-detail__teams a, div.match-detail__name a, div.match-detail__team a")
-        if len(anchors) >= 2:
-            home = urljoin("https://redscores.com", anchors[0].get('href'))
-            away = urljoin("https://redscores.com", anchors[1].get('href'))
-            return home, away
-        return None, None
+        arquivo_paginas.arquivo.guardar(match_url, "confronto", resp.text)
+        return dt.extrair_links_equipes(resp.text)
     except Exception as e:
         return None, None
 
 
 # ================================
-# Rotina Principal Otimizada
+# Helpers para Fase 3 (pool de workers HTTP)
 # ================================
-def rotina_diaria_noturna():
-    inicializar_banco()
-    log.info("--- Rotina diária iniciada ---")
-    start_global = time.time()
-
-    driver = None
-    try:
-        print("--- Fase 0: Autenticando no RedScore ---")
-        driver = login_redscore(REDSCORE_USER, REDSCORE_PASS)
+def _marca_da_equipa(jogos_da_equipa):
+    """
+    Data mais recente (YYYY-MM-DD) entre os jogos raspados de uma equipa, ou None.
+    Ignora datas de hoje em diante (jogos por disputar/em curso não podem fechar a marca).
+    """
+    hoje = date.today().strftime("%Y-%m-%d")
+    datas = [d for d in (dt._formatar_data(j.get("Data")) for j in jogos_da_equipa) if d and d < hoje]
+    return max(datas) if datas else None
 
-        # Fase 1: agenda
-        print("\n--- Fase 1: Coletando agenda de amanhã ---")
-        t1 = time.time()
-        jogos_amanha = dt.raspar_jogos_de_amanha(driver, cfg.LIGAS_PERMITIDAS)
-        t2 = time.time()
-        log.info(f"[TEMPO] Fase 1 concluída em {(t2 - t1):.2f}s")
 
-        if not jogos_amanha:
-            print("Nenhum jogo encontrado. Rotina concluída.")
-            log.info("Nenhum jogo encontrado para amanhã.")
-            return
+def _acumulador():
+    """`ao_concluir` para quem não grava em streaming: acumula (jogos, marcas_novas) em memória."""
+    jogos, marcas_novas, lock = [], {}, threading.Lock()
 
-        exportar_jogos_amanha_para_csv(jogos_amanha)
+    def receber(url, jogos_da_equipa, marca):
+        with lock:
+            jogos.extend(jogos_da_equipa)
+            if marca:
+                marcas_novas[url] = marca
+    return receber, jogos, marcas_novas
 
-        # Fase 2: obter links das equipas (paralelo via requests + cookies)
-        print(
-            f"\n--- Fase 2: Obtendo links das equipas de {len(jogos_amanha)} confrontos ---")
-        t1 = time.time()
 
-        # preparar session com cookies do Selenium
-        session = build_requests_session_from_selenium(driver)
-        equipas_a_visitar = {}
-        erros_confronto = []
-        faltou_fallback = []
+def raspar_times_sequencial(driver, itens, jogos_existentes, desc="Atualizando Histórico das Equipas", session=None, marcas=None, ao_concluir=None, parsing=None, prazo=None):
+    """
+    Caminho sequencial da fase 3: um único driver Selenium, time a time (pela ordem de `itens`,
+    até o `prazo` se esgotar).
+    Com `session`, cada time é tentado primeiro via requests. O driver só busca o HTML: o parsing
+    vai para o pool `parsing` (um próprio, se não for dado) e o driver segue logo para o time seguinte.
+    Retorna (jogos, marcas_novas), com marcas_novas = {url -> data mais recente raspada}.
+    Com `ao_concluir(url, jogos, marca)`, cada equipa é entregue assim que termina e nada é acumulado.
+    """
+    marcas = marcas or {}
+    jogos, marcas_novas = [], {}
+    if ao_concluir is None:
+        ao_concluir, jogos, marcas_novas = _acumulador()
+    proprio = parsing is None
+    if proprio:
+        parsing = parsing_paralelo.PoolParsing(jogos_existentes)
+
+    def entregar(url):
+        return lambda jogos_da_equipa: ao_concluir(
+            url, jogos_da_equipa or [], _marca_da_equipa(jogos_da_equipa or []))
 
-        # Função worker para ThreadPool
-        def worker_fetch(jogo):
-            url = jogo['link_confronto']
+    try:
+        # OBS: raspagem de times envolve 'see more' dinâmico. Mantemos sequencial com o mesmo driver.
+        for url, liga_correta in tqdm(itens, desc=desc):
+            if prazo and prazo.esgotado():
+                break
             try:
-                # 1) tenta requests
-                home, away = fetch_match_links_by_requests(session, url)
-                if home and away:
-                    return ("OK", home, away, jogo['liga'])
-                # 2) sinaliza fallback para selenium sequencial
-                return ("FALLBACK", url, jogo['liga'])
+                html = None
+                if session is not None:
+                    html = dt.obter_html_time_por_requests(session, url, liga_correta, timeout=REQUEST_TIMEOUT)
+                    if html is None:
+                        log.info(f"[TIME] Grelha ausente via HTTP, a usar Selenium: {url}")
+                if html is None:
+                    html = dt.obter_html_time(driver, url, liga_correta)
+                if html is None:
+                    ao_concluir(url, [], None)
+                    continue
+                parsing.jogos_time(html, url, liga_correta, marcas.get(url), ao_concluir=entregar(url))
             except Exception as e:
-                return ("ERROR", url, str(e))
+                log.error(f"[F3] Erro ao raspar time {url}: {e}")
+                auditoria.registrar(
+                    os.path.join("auditoria", f"erros_raspagem_times_{date.today()}.csv"), [url, str(e)])
+    finally:
+        if proprio:
+            parsing.fechar()
+        else:
+            parsing.esperar()
+    return jogos, marcas_novas
+
+
+def raspar_times_em_paralelo(driver, equipas_a_visitar, jogos_existentes, max_workers=MAX_WORKERS_FASE3, marcas=None, ao_concluir=None, prazo=None):
+    """
+    Fase 3 com um pool de workers HTTP que partilham a sessão de login (cookies do Selenium).
+    As equipas são tiradas pela ordem de `equipas_a_visitar` (ver agendador) até o `prazo` se esgotar.
+    Os workers só buscam o HTML; o parsing corre no pool de processos (parsing_paralelo), em
+    paralelo com os pedidos seguintes. Os times cuja página não pôde ser obtida/renderizada via
+    HTTP voltam para o caminho sequencial com o driver.
+    Retorna (jogos, marcas_novas), como raspar_times_sequencial (incluindo `ao_concluir`).
+    """
+    marcas = marcas or {}
+    itens = list(equipas_a_visitar.items())
+    if not itens:
+        return [], {}
+    if max_workers <= 0:
+        return raspar_times_sequencial(
+            driver, itens, jogos_existentes, session=build_requests_session_from_selenium(driver), marcas=marcas,
+            ao_concluir=ao_concluir, prazo=prazo)
+    jogos, marcas_novas = [], {}
+    if ao_concluir is None:
+        ao_concluir, jogos, marcas_novas = _acumulador()
+
+    fila = queue.Queue()
+    for item in itens:
+        fila.put(item)
+    # uma sessão por worker (requests.Session não é garantidamente thread-safe)
+    sessoes = [build_requests_session_from_selenium(driver)
+               for _ in range(min(max_workers, len(itens)))]
+    pbar = tqdm(total=len(itens), desc="Atualizando Histórico das Equipas")
+    faltou_fallback = []
+
+    def entregar(url, liga):
+        def receber(jogos_da_equipa):
+            if jogos_da_equipa is None:
+                faltou_fallback.append((url, liga))
+            else:
+                ao_concluir(url, jogos_da_equipa, _marca_da_equipa(jogos_da_equipa))
+        return receber
 
-        # dispara os workers
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS_FASE2) as exc:
-            futures = {exc.submit(worker_fetch, j): j for j in jogos_amanha}
-            for fut in tqdm(as_completed(futures), total=len(futures), desc="Verificando Confrontos"):
+    with parsing_paralelo.PoolParsing(jogos_existentes) as parsing:
+        def worker(session):
+            fallback = []
+            while not (prazo and prazo.esgotado()):
                 try:
-                    res = fut.result()
+                    url, liga = fila.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    html = dt.obter_html_time_por_requests(session, url, liga, timeout=REQUEST_TIMEOUT)
+                    if html is None:
+                        fallback.append((url, liga))
+                    else:
+                        parsing.jogos_time(html, url, liga, marcas.get(url), ao_concluir=entregar(url, liga))
                 except Exception as e:
-                    log.error(f"[F2] Future result error: {e}")
-                    continue
+                    log.warning(f"[F3] Worker HTTP falhou em {url}: {e}")
+                    fallback.append((url, liga))
+                finally:
+                    pbar.update(1)
+            return fallback
+
+        with ThreadPoolExecutor(max_workers=len(sessoes)) as exc:
+            for fut in as_completed([exc.submit(worker, s) for s in sessoes]):
+                faltou_fallback.extend(fut.result())
+        parsing.esperar()
+        pbar.close()
+        metricas.registo.contar("f3_fallback", len(faltou_fallback))
+
+        if faltou_fallback:
+            log.info(
+                f"[F3] {len(faltou_fallback)} equipas requerem fallback com Selenium (sequencial).")
+            # o fallback respeita a mesma ordem de valor
+            posicao = {url: i for i, (url, _) in enumerate(itens)}
+            faltou_fallback.sort(key=lambda item: posicao[item[0]])
+            raspar_times_sequencial(
+                driver, faltou_fallback, jogos_existentes, desc="Fallback Selenium (equipas)", marcas=marcas,
+                ao_concluir=ao_concluir, parsing=parsing, prazo=prazo)
+    return jogos, marcas_novas
+
 
-                if res[0] == "OK":
-                    _, home, away, liga = res
+# ================================
+# Fase 2
+# ================================
+def obter_links_das_equipas(conn, driver, jogos_amanha):
+    """
+    Fase 2: resolve os links das equipas de cada confronto (cache -> asyncio/HTTP2 -> Selenium).
+    Retorna {url_da_equipa -> liga}.
+    """
+    # preparar session com cookies do Selenium
+    session = build_requests_session_from_selenium(driver)
+    equipas_a_visitar = {}
+    erros_confronto = []
+    faltou_fallback = []
+    resolvidos = []  # (jogo, home, away) resolvidos pela rede, para gravar no cache
+
+    # 0) cache persistente: confrontos/equipas já conhecidos não vão à rede
+    cache_links.inicializar_cache(conn)
+    cache_links.expurgar_cache(conn, CACHE_TTL_DIAS)
+    cache_confrontos, cache_equipas = cache_links.carregar_cache(conn)
+
+    jogos_por_url = {}
+    for jogo in jogos_amanha:
+        links = cache_links.links_do_cache(jogo, cache_confrontos, cache_equipas)
+        if links:
+            equipas_a_visitar[links[0]] = jogo['liga']
+            equipas_a_visitar[links[1]] = jogo['liga']
+        else:
+            jogos_por_url[jogo['link_confronto']] = jogo
+    log.info(
+        f"[F2] Cache: {len(jogos_amanha) - len(jogos_por_url)} confrontos resolvidos sem rede, {len(jogos_por_url)} pendentes.")
+
+    with tqdm(total=len(jogos_por_url), desc="Verificando Confrontos") as pbar, \
+            parsing_paralelo.PoolParsing() as parsing:
+        resultados = http_async.resolver_links_confrontos(
+            jogos_por_url.keys(), headers=dict(session.headers), cookies=session.cookies,
+            pool_conexoes=POOL_CONEXOES_FASE2,
+            timeout=REQUEST_TIMEOUT, ao_concluir=lambda _: pbar.update(1), parsing=parsing)
+
+    for url, res in resultados.items():
+        jogo = jogos_por_url[url]
+        if res[0] == "OK":
+            _, _, home, away = res
+            equipas_a_visitar[home] = jogo['liga']
+            equipas_a_visitar[away] = jogo['liga']
+            resolvidos.append((jogo, home, away))
+        elif res[0] == "FALLBACK":
+            faltou_fallback.append(jogo)
+        else:
+            _, _, err = res
+            erros_confronto.append((url, err))
+
+    # Se houver fallbacks, processe sequencialmente com Selenium (mais lento, mas robusto)
+    if faltou_fallback:
+        log.info(
+            f"[F2] {len(faltou_fallback)} confrontos requerem fallback com Selenium (sequencial).")
+        for jogo in tqdm(faltou_fallback, desc="Fallback Selenium (confrontos)"):
+            url, liga = jogo['link_confronto'], jogo['liga']
+            try:
+                home, away = dt.obter_links_equipes_confronto(
+                    driver, url)  # já tem retry no data.py
+                if home and away:
                     equipas_a_visitar[home] = liga
                     equipas_a_visitar[away] = liga
-                elif res[0] == "FALLBACK":
-                    _, url, liga = res
-                    faltou_fallback.append((url, liga))
+                    resolvidos.append((jogo, home, away))
                 else:
-                    _, url, err = res
-                    erros_confronto.append((url, err))
+                    erros_confronto.append(
+                        (url, "no_links_found_after_selenium"))
+            except Exception as e:
+                erros_confronto.append((url, str(e)))
 
-        # Se houver fallbacks, processe sequencialmente com Selenium (mais lento, mas robusto)
-        if faltou_fallback:
-            log.info(
-                f"[F2] {len(faltou_fallback)} confrontos requerem fallback com Selenium (sequencial).")
-            for url, liga in tqdm(faltou_fallback, desc="Fallback Selenium (confrontos)"):
-                try:
-                    home, away = dt.obter_links_equipes_confronto(
-                        driver, url)  # já tem retry no data.py
-                    if home and away:
-                        equipas_a_visitar[home] = liga
-                        equipas_a_visitar[away] = liga
-                    else:
-                        erros_confronto.append(
-                            (url, "no_links_found_after_selenium"))
-                except Exception as e:
-                    erros_confronto.append((url, str(e)))
-
-        # persistir erros se houver
-        if erros_confronto:
-            os.makedirs("auditoria", exist_ok=True)
-            with open(os.path.join("auditoria", f"erros_links_confronto_{date.today()}.csv"), "a", newline="", encoding="utf-8") as f:
-                import csv
-                writer = csv.writer(f)
-                for row in erros_confronto:
-                    writer.writerow(row)
-            log.warning(
-                f"[F2] {len(erros_confronto)} erros ao extrair links de confronto (ver auditoria).")
+    cache_links.gravar_no_cache(conn, resolvidos)
+
+    # persistir erros se houver
+    if erros_confronto:
+        arquivo_erros = os.path.join("auditoria", f"erros_links_confronto_{date.today()}.csv")
+        for row in erros_confronto:
+            auditoria.registrar(arquivo_erros, row)
+        log.warning(
+            f"[F2] {len(erros_confronto)} erros ao extrair links de confronto (ver auditoria).")
+    metricas.registo.contar("f2_confrontos", len(jogos_amanha))
+    metricas.registo.contar("f2_cache", len(jogos_amanha) - len(jogos_por_url))
+    metricas.registo.contar("f2_fallback", len(faltou_fallback))
+    metricas.registo.contar("f2_erros", len(erros_confronto))
+    return equipas_a_visitar
+
+
+# ================================
+# Relatório da execução
+# ================================
+def gravar_relatorio_execucao(duracao_total):
+    metricas.registo.fase("total", duracao_total)
+    config = {
+        "POOL_CONEXOES_FASE2": POOL_CONEXOES_FASE2, "REQUEST_TIMEOUT": REQUEST_TIMEOUT,
+        "MAX_WORKERS_FASE3": MAX_WORKERS_FASE3, "AIMD": concorrencia.redscore.estado(),
+        "ORCAMENTO_FASE3_MIN": agendador.ORCAMENTO_FASE3_MIN,
+    }
+    try:
+        caminho = os.path.join(
+            PASTA_RELATORIOS, f"execucao_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+        metricas.registo.gravar_json(caminho, config)
+        if RELATORIO_PROMETHEUS:
+            metricas.registo.gravar_prometheus(RELATORIO_PROMETHEUS)
+    except Exception as e:
+        log.warning(f"[METRICAS] Não foi possível gravar o relatório da execução: {e}")
+
+
+def abrir_banco(nome_db=NOME_DB):
+    """Conexão a dados.db com o esquema (e os agregados/triggers) criado ou migrado."""
+    conn = banco.conectar(nome_db)
+    banco.inicializar_banco(conn)
+    consultas.inicializar_consultas(conn)
+    agenda.inicializar_agenda(conn)
+    historico_odds.inicializar_historico_odds(conn)
+    exportacao.inicializar_exportacoes(conn)
+    return conn
+
+
+# ================================
+# Atualização intradiária das odds
+# ================================
+def atualizar_odds_agenda():
+    """
+    Modo leve (--odds): relê só a página da agenda de amanhã e grava-a em 'agenda'; os
+    triggers de historico_odds guardam um snapshot apenas dos jogos cujas odds mudaram.
+    """
+    conn = abrir_banco()
+    driver = None
+    try:
+        driver = autenticar()
+        jogos_amanha = dt.raspar_jogos_de_amanha(driver, cfg.LIGAS_PERMITIDAS)
+        antes = conn.execute("SELECT COUNT(*) FROM odds_historico").fetchone()[0]
+        gravados = agenda.gravar_agenda(conn, jogos_amanha)
+        mudaram = conn.execute("SELECT COUNT(*) FROM odds_historico").fetchone()[0] - antes
+        log.info(f"[ODDS] Agenda relida: {gravados} jogos, {mudaram} com odds novas ou alteradas.")
+        print(f"✅ {gravados} jogos na agenda; {mudaram} snapshots de odds novos.")
+    except Exception as e:
+        log.error(f"[ODDS] Falha na atualização das odds: {e}")
+        print(f"ERRO: {e}")
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        auditoria.descarregar()
+        arquivo_paginas.arquivo.fechar()
+        conn.close()
 
-        t2 = time.time()
-        log.info(
-            f"[TEMPO] Fase 2 concluída em {(t2 - t1):.2f}s (links extraídos: {len(equipas_a_visitar)})")
+
+# ================================
+# Rotina Principal Otimizada
+# ================================
+def rotina_diaria_noturna(retomar=False, prazo_fase3_min=agendador.ORCAMENTO_FASE3_MIN):
+    """
+    Rotina noturna completa. O progresso de cada fase fica em dados.db (checkpoint): com
+    `retomar`, a última execução interrompida continua de onde parou (com o dia da agenda dela).
+    Com `prazo_fase3_min`, a fase 3 pára de pegar em equipas ao fim desses minutos (as mais
+    valiosas vão primeiro, ver agendador); o que foi raspado é gravado e exportado na mesma.
+    """
+    # uma única conexão (WAL) para toda a rotina: cache, marcas, jogos, exportação e VACUUM
+    conn = abrir_banco()
+    ck = checkpoint.Checkpoint(NOME_DB, str(dia))
+    log.info("--- Rotina diária iniciada ---")
+    start_global = time.time()
+    metricas.registo.reiniciar()
+
+    driver = None
+    try:
+        fase_concluida = ck.iniciar(retomar)
+        if fase_concluida >= checkpoint.FASE_GRAVACAO:
+            print(f"A execução de {ck.dia} já foi concluída. Nada a retomar.")
+            return
+
+        print("--- Fase 0: Autenticando no RedScore ---")
+        driver = autenticar()
+
+        # Fase 1: agenda
+        if fase_concluida >= checkpoint.FASE_AGENDA:
+            jogos_amanha = ck.carregar_agenda()
+            print(f"\n--- Fase 1: agenda retomada do checkpoint ({len(jogos_amanha)} jogos) ---")
+        else:
+            print("\n--- Fase 1: Coletando agenda de amanhã ---")
+            t1 = time.time()
+            jogos_amanha = dt.raspar_jogos_de_amanha(driver, cfg.LIGAS_PERMITIDAS)
+            t2 = time.time()
+            log.info(f"[TEMPO] Fase 1 concluída em {(t2 - t1):.2f}s")
+            metricas.registo.fase("fase1_agenda", t2 - t1)
+            auditoria.descarregar()
+
+            if not jogos_amanha:
+                print("Nenhum jogo encontrado. Rotina concluída.")
+                log.info("Nenhum jogo encontrado para amanhã.")
+                return
+
+            exportar_jogos_amanha_para_csv(jogos_amanha)
+            agenda.gravar_agenda(conn, jogos_amanha)
+            ck.gravar_agenda(jogos_amanha)
+
+        # Fase 2: obter links das equipas (asyncio/HTTP2 + cookies)
+        if fase_concluida >= checkpoint.FASE_LINKS:
+            equipas_a_visitar = ck.carregar_equipas()
+            print(f"\n--- Fase 2: links retomados do checkpoint ({len(equipas_a_visitar)} equipas) ---")
+        else:
+            print(
+                f"\n--- Fase 2: Obtendo links das equipas de {len(jogos_amanha)} confrontos ---")
+            t1 = time.time()
+            equipas_a_visitar = obter_links_das_equipas(conn, driver, jogos_amanha)
+            ck.gravar_equipas(equipas_a_visitar)
+            t2 = time.time()
+            log.info(
+                f"[TEMPO] Fase 2 concluída em {(t2 - t1):.2f}s (links extraídos: {len(equipas_a_visitar)})")
+            metricas.registo.fase("fase2_links", t2 - t1)
+            auditoria.descarregar()
 
         if not equipas_a_visitar:
             print("Não foi possível extrair links de equipas. Rotina concluída.")
             log.warning("Nenhum link de equipa encontrado.")
             return
 
-        # Fase 3: Raspar dados dos times (sequencial por driver)
+        # Fase 3: Raspar dados dos times (pool HTTP + fallback sequencial por driver)
+        # cada equipa concluída vai logo para o checkpoint; ao retomar só faltam as pendentes
+        pendentes = ck.carregar_equipas(so_pendentes=True)
         print(
-            f"\n--- Fase 3: Atualizando histórico de {len(equipas_a_visitar)} equipas ---")
+            f"\n--- Fase 3: Atualizando histórico de {len(pendentes)}/{len(equipas_a_visitar)} equipas ---")
         t1 = time.time()
-        jogos_existentes = carregar_jogos_existentes()
-        todos_os_jogos_novos = []
-
-        # OBS: raspagem de times envolve 'see more' dinâmico. Mantemos sequencial com o mesmo driver.
-        for url, liga_correta in tqdm(equipas_a_visitar.items(), desc="Atualizando Histórico das Equipas"):
+        # só as marcas das equipas a visitar; o conjunto de chaves existentes fica limitado
+        # aos jogos a partir da marca mais antiga (o resto é cortado pela própria marca)
+        marcas = banco.carregar_marcas_equipas(conn, pendentes.keys())
+        pendentes = agendador.ordenar_equipas(
+            pendentes, agendador.horas_de_inicio(conn, jogos_amanha), marcas, ck.dia)
+        prazo = agendador.Prazo(prazo_fase3_min)
+        jogos_existentes = banco.carregar_jogos_existentes(
+            conn, desde=min(marcas.values())) if marcas else set()
+        log.info(
+            f"[F3] Marcas carregadas para {len(marcas)}/{len(pendentes)} equipas ({len(jogos_existentes)} chaves recentes).")
+        # fases 3-4 em streaming: cada equipa vai para a fila de gravação e é gravada em lotes
+        grav = gravacao.GravacaoContinua(NOME_DB, ck)
+        try:
+            raspar_times_em_paralelo(
+                driver, pendentes, jogos_existentes, marcas=marcas, ao_concluir=grav.receber, prazo=prazo)
+        except BaseException:
+            # grava o que já chegou à fila, mas é o erro da fase 3 que sobe
             try:
-                jogos_da_equipa = dt.raspar_dados_time(
-                    driver, url, liga_correta, jogos_existentes, cfg.LIGAS_PERMITIDAS, cfg.LIMITE_JOGOS_POR_TIME)
-                todos_os_jogos_novos.extend(jogos_da_equipa)
-                # pausa leve para não sobrecarregar
-                time.sleep(random.uniform(0.6, 1.2))
+                grav.finalizar()
             except Exception as e:
-                log.error(f"[F3] Erro ao raspar time {url}: {e}")
-                with open(os.path.join("auditoria", f"erros_raspagem_times_{date.today()}.csv"), "a", newline="", encoding="utf-8") as f:
-                    import csv
-                    writer = csv.writer(f)
-                    writer.writerow([url, str(e)])
+                log.error(f"[GRAVACAO] Falha ao finalizar após erro na fase 3: {e}")
+            raise
+        raspados, inseridos, atualizados = grav.finalizar()
+        # equipas que o prazo deixou por visitar ficam pendentes no checkpoint (--resume)
+        adiadas = len(ck.carregar_equipas(so_pendentes=True)) if prazo.esgotado() else 0
+        if adiadas:
+            print(f"⏱️ Prazo da fase 3 esgotado: {adiadas} equipas ficam para --resume.")
+            log.warning(f"[F3] Prazo esgotado: {adiadas} equipas por visitar.")
 
         t2 = time.time()
         log.info(
-            f"[TEMPO] Fase 3 concluída em {(t2 - t1):.2f}s (jogos raspados: {len(todos_os_jogos_novos)})")
-
-        # Fase 4: processamento e salvamento
-        if todos_os_jogos_novos:
-            print(
-                f"\n--- Fase 4: Processando e salvando {len(todos_os_jogos_novos)} jogos raspados ---")
-            df_novos_jogos = dt.processar_dados_raspados(todos_os_jogos_novos)
-
-            if df_novos_jogos.empty:
-                log.warning("Nenhum jogo processado com sucesso.")
-            else:
-                df_novos_jogos.drop_duplicates(
-                    subset=["Data", "Home", "Away"], inplace=True, keep='last')
-
-                jogos_existentes_df = pd.DataFrame(
-                    list(jogos_existentes), columns=["Data", "Home", "Away"])
-                if not jogos_existentes_df.empty:
-                    df_novos_jogos = df_novos_jogos.merge(
-                        jogos_existentes_df,
-                        on=["Data", "Home", "Away"],
-                        how='left',
-                        indicator=True
-                    ).query('_merge == "left_only"').drop('_merge', axis=1)
-
-                if not df_novos_jogos.empty:
-                    salvar_no_banco(df_novos_jogos)
-                    print(
-                        f"✅ {len(df_novos_jogos)} novos jogos salvos no banco.")
-                else:
-                    print("Todos os jogos já estavam no banco de dados.")
+            f"[TEMPO] Fase 3 concluída em {(t2 - t1):.2f}s (jogos raspados: {raspados})")
+        metricas.registo.fase("fase3_equipas", t2 - t1)
+        metricas.registo.contar("f3_equipas", len(pendentes) - adiadas)
+        metricas.registo.contar("f3_adiadas", adiadas)
+        metricas.registo.contar("f4_inseridos", inseridos)
+        metricas.registo.contar("f4_atualizados", atualizados)
+        auditoria.descarregar()
+
+        # Fase 4: exportação e manutenção (os jogos já foram gravados durante a fase 3)
+        t1 = time.time()
+        if inseridos or atualizados:
+            print(f"✅ {inseridos} novos jogos salvos no banco ({atualizados} atualizados).")
+        elif raspados:
+            print("Todos os jogos já estavam no banco de dados.")
         else:
             print("\nNenhum resultado novo encontrado para as equipas de amanhã.")
+        # linhas já exportadas que mudaram: o modo incremental só acrescenta, reescreve-se tudo.
+        # Ao retomar, lotes da execução interrompida podem ter atualizado linhas sem exportação.
+        csv_completo = EXPORT_CSV_COMPLETO or atualizados > 0 or retomar
+        if not adiadas:
+            ck.finalizar()
 
-        exportar_para_csv()
-        maybe_vacuum_db(NOME_DB)
+        exportar_para_csv(conn, completo=csv_completo)
+        maybe_vacuum_db(conn, NOME_DB)
+        metricas.registo.fase("fase4_gravacao", time.time() - t1)
 
     except Exception as e:
         log.error(f"Um erro crítico ocorreu na rotina principal: {e}")
@@ -345,6 +610,11 @@ def rotina_diaria_noturna():
                 driver.quit()
             except Exception:
                 pass
+        auditoria.descarregar()
+        arquivo_paginas.arquivo.fechar()
+        ck.fechar()
+        conn.close()
+        gravar_relatorio_execucao(time.time() - start_global)
 
     log.info(
         f"--- Rotina concluída em {(time.time() - start_global):.2f}s ---")
@@ -352,4 +622,16 @@ def rotina_diaria_noturna():
 
 
 if __name__ == "__main__":
-    rotina_diaria_noturna()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Rotina noturna do coletor RedScore.")
+    parser.add_argument("--resume", action="store_true",
+                        help="retoma a última execução interrompida a partir do checkpoint")
+    parser.add_argument("--odds", action="store_true",
+                        help="só relê a agenda de amanhã e regista as odds que mudaram")
+    parser.add_argument("--prazo", type=float, metavar="MINUTOS", default=agendador.ORCAMENTO_FASE3_MIN,
+                        help="orçamento de tempo da fase 3; as equipas que sobram ficam para --resume")
+    args = parser.parse_args()
+    configurar_logging()
+    if args.odds:
+        atualizar_odds_agenda()
+    else:
+        rotina_diaria_noturna(retomar=args.resume, prazo_fase3_min=args.prazo)
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import metricas
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+CONCORRENCIA_INICIAL = 4           # pedidos simultâneos ao arrancar
+CONCORRENCIA_MINIMA = 1
+CONCORRENCIA_MAXIMA = 16           # teto (também o nº de threads HTTP da fase 3)
+LATENCIA_ALVO_S = 2.0              # resposta HTTP mais lenta do que isto conta como congestionamento
+LATENCIA_ALVO_SELENIUM_S = 10.0    # idem, para uma navegação Selenium (render incluído)
+FATOR_RECUO = 0.5                  # limite *= FATOR_RECUO a cada sinal de congestionamento
+JANELA_RECUO_S = 2.0               # no máximo um recuo por janela (uma rajada de erros conta uma vez)
+INTERVALO_MIN_S = 0.1              # intervalo mínimo entre o início de dois pedidos (em regime bom)
+INTERVALO_RECUO_S = 0.5            # intervalo mínimo depois de um recuo
+INTERVALO_MAX_S = 10.0
+STATUS_CONGESTIONAMENTO = {429, 500, 502, 503, 504}
+# ================================
+
+
+class Resultado:
+    """O que o chamador observou num pedido (preenchido dentro do `with`)."""
+
+    def __init__(self):
+        self.status, self.erro, self.retry_after = None, False, None
+
+    def resposta(self, resp):
+        """Regista o status e o Retry-After (em segundos) de uma resposta requests/httpx."""
+        self.status = resp.status_code
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            self.retry_after = min(float(retry_after), INTERVALO_MAX_S)
+
+
+class ControladorAIMD:
+    """
+    Orçamento partilhado de pedidos ao RedScore: HTTP da fase 2 (asyncio) e da fase 3 (threads)
+    e as navegações Selenium dos fallbacks tiram todos daqui o seu slot.
+      - aumento aditivo: cada resposta boa e dentro da latência alvo soma 1/limite ao limite
+        (≈ +1 por cada janela completa de pedidos) e encurta o intervalo entre pedidos;
+      - recuo multiplicativo: 429/5xx, timeout/erro de rede ou latência acima do alvo multiplicam
+        o limite por FATOR_RECUO e duplicam o intervalo;
+      - Retry-After suspende todos os pedidos até ao instante indicado.
+    """
+
+    def __init__(self, inicial=CONCORRENCIA_INICIAL, minimo=CONCORRENCIA_MINIMA, maximo=CONCORRENCIA_MAXIMA,
+                 latencia_alvo_s=LATENCIA_ALVO_S, intervalo_min_s=INTERVALO_MIN_S):
+        self.minimo, self.maximo = minimo, maximo
+        self.latencia_alvo_s = latencia_alvo_s
+        self.intervalo_min_s = intervalo_min_s
+        self.limite = float(inicial)
+        self.intervalo = intervalo_min_s
+        self.em_curso = 0
+        self.recuos = 0
+        self._proximo_inicio = 0.0
+        self._pausa_ate = 0.0
+        self._ultimo_recuo = float("-inf")
+        self._cond = threading.Condition()
+
+    def _tentar(self):
+        """Reserva um slot e retorna 0, ou retorna quantos segundos esperar (None = até libertarem um)."""
+        agora = time.monotonic()
+        if agora < self._pausa_ate:
+            return self._pausa_ate - agora
+        if self.em_curso >= int(self.limite):
+            return None
+        if agora < self._proximo_inicio:
+            return self._proximo_inicio - agora
+        self.em_curso += 1
+        self._proximo_inicio = agora + self.intervalo
+        return 0
+
+    def adquirir(self):
+        with self._cond:
+            while True:
+                espera = self._tentar()
+                if espera == 0:
+                    return
+                self._cond.wait(timeout=espera)
+
+    async def adquirir_async(self):
+        while True:
+            with self._cond:
+                espera = self._tentar()
+            if espera == 0:
+                return
+            await asyncio.sleep(0.05 if espera is None else espera)
+
+    def libertar(self, latencia=None, resultado=None, latencia_alvo_s=None):
+        resultado = resultado or Resultado()
+        alvo = latencia_alvo_s or self.latencia_alvo_s
+        with self._cond:
+            self.em_curso -= 1
+            agora = time.monotonic()
+            if resultado.retry_after:
+                self._pausa_ate = max(self._pausa_ate, agora + resultado.retry_after)
+            congestionado = (resultado.erro or resultado.status in STATUS_CONGESTIONAMENTO
+                             or (latencia is not None and latencia > alvo))
+            if congestionado:
+                if agora - self._ultimo_recuo >= JANELA_RECUO_S:
+                    self._ultimo_recuo = agora
+                    self.recuos += 1
+                    self.limite = max(self.minimo, self.limite * FATOR_RECUO)
+                    self.intervalo = min(INTERVALO_MAX_S, max(2 * self.intervalo, INTERVALO_RECUO_S))
+                    metricas.registo.contar("aimd_recuos")
+                    log.info(f"[AIMD] Recuo: limite={self.limite:.1f}, intervalo={self.intervalo:.2f}s "
+                             f"(status={resultado.status}, erro={resultado.erro}, latência={latencia or 0:.2f}s)")
+            elif resultado.status is None or resultado.status < 400:
+                self.limite = min(self.maximo, self.limite + 1 / self.limite)
+                self.intervalo = max(self.intervalo_min_s, self.intervalo * 0.9)
+            self._cond.notify_all()
+
+    @contextmanager
+    def pedido(self, latencia_alvo_s=None):
+        """Slot para um pedido (bloqueante); exceções dentro do bloco contam como erro."""
+        self.adquirir()
+        resultado, t0 = Resultado(), time.perf_counter()
+        try:
+            yield resultado
+        except Exception:
+            resultado.erro = True
+            raise
+        finally:
+            self.libertar(time.perf_counter() - t0, resultado, latencia_alvo_s)
+
+    @asynccontextmanager
+    async def pedido_async(self, latencia_alvo_s=None):
+        await self.adquirir_async()
+        resultado, t0 = Resultado(), time.perf_counter()
+        try:
+            yield resultado
+        except Exception:
+            resultado.erro = True
+            raise
+        finally:
+            self.libertar(time.perf_counter() - t0, resultado, latencia_alvo_s)
+
+    def estado(self):
+        with self._cond:
+            return {"limite": round(self.limite, 2), "intervalo_s": round(self.intervalo, 3),
+                    "recuos": self.recuos, "maximo": self.maximo}
+
+
+# instância partilhada por todas as fases (um único orçamento para o host)
+redscore = ControladorAIMD()
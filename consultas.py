@@ -0,0 +1,229 @@
+"""
+Consultas ao histórico de dados.db para extração de features (sem carregar o CSV):
+
+    conn = banco.conectar("dados.db")
+    consultas.ultimos_jogos(conn, "Flamengo", "2025-08-01", n=10)
+    consultas.medias_moveis(conn, "Flamengo", "2025-08-01", n=5)
+    consultas.tabela_liga(conn, "Brasil - Serie A", ano="2025")
+    consultas.features_jogos_do_dia(conn, pd.read_csv("jogos_do_dia/Jogos_do_Dia_RedScore_2025-08-22.csv"),
+                                    data="2025-08-22")
+
+O histórico por equipa usa a chave (Home_Id, Data, ...) e o índice (Away_Id, Data) de 'jogos'; as tabelas
+de liga por ano vêm de 'estatisticas_times', mantida por triggers a cada INSERT/UPDATE em 'jogos'.
+"""
+import logging
+
+import pandas as pd
+
+import agenda
+import banco
+
+log = logging.getLogger(__name__)
+
+# coluna do ponto de vista da equipa -> (coluna de 'jogos' quando joga em casa, quando joga fora)
+PERSPECTIVA = {
+    "Gols_Pro": ("H_Gols_FT", "A_Gols_FT"), "Gols_Contra": ("A_Gols_FT", "H_Gols_FT"),
+    "Gols_Pro_HT": ("H_Gols_HT", "A_Gols_HT"), "Gols_Contra_HT": ("A_Gols_HT", "H_Gols_HT"),
+    "Chutes_Pro": ("H_Chute", "A_Chute"), "Chutes_Contra": ("A_Chute", "H_Chute"),
+    "Chutes_Gol_Pro": ("H_Chute_Gol", "A_Chute_Gol"), "Chutes_Gol_Contra": ("A_Chute_Gol", "H_Chute_Gol"),
+    "Ataques_Pro": ("H_Ataques", "A_Ataques"), "Ataques_Contra": ("A_Ataques", "H_Ataques"),
+    "Escanteios_Pro": ("H_Escanteios", "A_Escanteios"), "Escanteios_Contra": ("A_Escanteios", "H_Escanteios"),
+    "Odd_Vitoria": ("Odd_H", "Odd_A"), "Odd_Empate": ("Odd_D", "Odd_D"), "Odd_Derrota": ("Odd_A", "Odd_H"),
+}
+# somas guardadas por (liga, ano, equipa) em 'estatisticas_times'
+SOMAS = ["Gols_Pro", "Gols_Contra", "Chutes_Pro", "Chutes_Contra", "Escanteios_Pro", "Escanteios_Contra"]
+CONTAGENS = ["Jogos", "Vitorias", "Empates", "Derrotas"]
+
+
+# ================================
+# SQL gerado a partir de PERSPECTIVA
+# ================================
+def _expressoes(linha, em_casa):
+    """{coluna -> expressão SQL} de uma linha de 'jogos' do ponto de vista de uma das equipas."""
+    lado = 0 if em_casa else 1
+    expr = {nome: f"{linha}.{colunas[lado]}" for nome, colunas in PERSPECTIVA.items()}
+    pro, contra = expr["Gols_Pro"], expr["Gols_Contra"]
+    expr.update({
+        "Time_Id": f"{linha}.{'Home_Id' if em_casa else 'Away_Id'}",
+        "Adversario_Id": f"{linha}.{'Away_Id' if em_casa else 'Home_Id'}",
+        "Jogos": "1", "Vitorias": f"({pro} > {contra})",
+        "Empates": f"({pro} = {contra})", "Derrotas": f"({pro} < {contra})",
+    })
+    return expr
+
+
+def _sql_historico(em_casa, param):
+    """Jogos da equipa :<param> antes de :antes num dos mandos, pelo índice (Time, Data)."""
+    e = _expressoes("j", em_casa)
+    return f"""
+        SELECT j.Data, j.Liga_Id, '{'H' if em_casa else 'A'}' AS Mando, {e['Adversario_Id']} AS Adversario_Id,
+            {", ".join(f"{e[c]} AS {c}" for c in PERSPECTIVA)}
+        FROM jogos j
+        WHERE {e['Time_Id']} = (SELECT Id FROM times WHERE Nome = :{param}) AND j.Data < :antes
+        ORDER BY j.Data DESC LIMIT :n"""
+
+
+def _sql_ultimos(param):
+    """Os últimos :n jogos (casa e fora) da equipa :<param> antes de :antes."""
+    return f"""
+        SELECT * FROM ({_sql_historico(True, param)})
+        UNION ALL
+        SELECT * FROM ({_sql_historico(False, param)})
+        ORDER BY Data DESC LIMIT :n"""
+
+
+SQL_ULTIMOS_JOGOS = f"""
+    SELECT u.Data, l.Nome AS Liga, u.Mando, a.Nome AS Adversario, {", ".join(f"u.{c}" for c in PERSPECTIVA)}
+    FROM ({_sql_ultimos("time")}) u
+    JOIN times a ON a.Id = u.Adversario_Id
+    LEFT JOIN ligas l ON l.Id = u.Liga_Id
+    ORDER BY u.Data DESC"""
+
+# as duas equipas de um confronto numa só consulta
+SQL_CONFRONTO = f"""
+    SELECT 'home' AS Lado, * FROM ({_sql_ultimos("home")})
+    UNION ALL
+    SELECT 'away' AS Lado, * FROM ({_sql_ultimos("away")})"""
+
+
+def _sql_acumular(linha, em_casa, sinal):
+    e = _expressoes(linha, em_casa)
+    colunas = CONTAGENS + SOMAS
+    return f"""
+        INSERT INTO estatisticas_times (Liga_Id, Ano, Time_Id, {", ".join(colunas)})
+        VALUES (COALESCE({linha}.Liga_Id, 0), substr({linha}.Data, 1, 4), {e['Time_Id']},
+                {", ".join(f"{sinal}COALESCE({e[c]}, 0)" for c in colunas)})
+        ON CONFLICT (Liga_Id, Ano, Time_Id) DO UPDATE SET
+            {", ".join(f"{c} = {c} + excluded.{c}" for c in colunas)};"""
+
+
+def _sql_reconstruir():
+    colunas = CONTAGENS + SOMAS
+    lados = " UNION ALL ".join(
+        f"SELECT j.Liga_Id, j.Data, {', '.join(f'{e[c]} AS {c}' for c in ['Time_Id'] + colunas)} FROM jogos j"
+        for e in (_expressoes("j", True), _expressoes("j", False)))
+    return f"""
+        INSERT INTO estatisticas_times (Liga_Id, Ano, Time_Id, {", ".join(colunas)})
+        SELECT COALESCE(Liga_Id, 0), substr(Data, 1, 4), Time_Id, {", ".join(f"SUM(COALESCE({c}, 0))" for c in colunas)}
+        FROM ({lados})
+        GROUP BY 1, 2, 3"""
+
+
+# ================================
+# Agregados materializados
+# ================================
+def inicializar_consultas(conn):
+    """Cria 'estatisticas_times' e os triggers que a mantêm; preenche-a se ainda não existia."""
+    nova = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'estatisticas_times'").fetchone()
+    with conn:
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS estatisticas_times (
+            Liga_Id INTEGER, Ano TEXT, Time_Id INTEGER,
+            {", ".join(f"{c} INTEGER DEFAULT 0" for c in CONTAGENS + SOMAS)},
+            PRIMARY KEY (Liga_Id, Ano, Time_Id)
+        )""")
+        # um UPDATE (UPSERT com valores diferentes) retira a versão antiga e soma a nova
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS jogos_estatisticas_insert AFTER INSERT ON jogos BEGIN
+            {_sql_acumular("NEW", True, "")}
+            {_sql_acumular("NEW", False, "")}
+        END""")
+        conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS jogos_estatisticas_update AFTER UPDATE ON jogos BEGIN
+            {_sql_acumular("OLD", True, "-")}
+            {_sql_acumular("OLD", False, "-")}
+            {_sql_acumular("NEW", True, "")}
+            {_sql_acumular("NEW", False, "")}
+        END""")
+        if nova:
+            conn.execute(_sql_reconstruir())
+    if nova:
+        log.info("[CONSULTAS] Tabela estatisticas_times criada a partir de 'jogos'.")
+
+
+def reconstruir_agregados(conn):
+    """Recalcula 'estatisticas_times' do zero (ex.: depois de correções manuais em 'jogos')."""
+    with conn:
+        conn.execute("DELETE FROM estatisticas_times")
+        conn.execute(_sql_reconstruir())
+
+
+# ================================
+# API
+# ================================
+def ultimos_jogos(conn, time, antes_de, n=10):
+    """
+    Últimos `n` jogos da equipa (casa e fora) com data anterior a `antes_de` ("YYYY-MM-DD"),
+    do mais recente para o mais antigo, com as colunas do ponto de vista da equipa (PERSPECTIVA).
+    """
+    return pd.read_sql_query(SQL_ULTIMOS_JOGOS, conn, params={
+        "time": banco.nome_canonico(time), "antes": antes_de, "n": n})
+
+
+def _resumo(jogos):
+    """Médias por jogo das colunas de PERSPECTIVA, mais o número de jogos e os pontos por jogo."""
+    resumo = jogos[list(PERSPECTIVA)].astype("float64").mean()
+    pontos = 3 * (jogos["Gols_Pro"] > jogos["Gols_Contra"]) + (jogos["Gols_Pro"] == jogos["Gols_Contra"])
+    resumo["Pontos"] = pontos.mean()
+    resumo["Jogos"] = len(jogos)
+    return resumo
+
+
+def medias_moveis(conn, time, antes_de, n=5):
+    """Médias dos últimos `n` jogos da equipa antes de `antes_de` (Series; NaN se não houver jogos)."""
+    return _resumo(ultimos_jogos(conn, time, antes_de, n))
+
+
+def tabela_liga(conn, liga, ano=None, desde=None, ate=None):
+    """
+    Classificação da liga. Por omissão (ou com `ano`, "YYYY") vem de 'estatisticas_times';
+    com `desde`/`ate` ("YYYY-MM-DD", `ate` exclusivo) é calculada pelo índice (Liga_Id, Data),
+    útil para temporadas que atravessam o ano civil.
+    """
+    contagens = ", ".join(CONTAGENS + SOMAS)
+    if desde or ate:
+        lados = " UNION ALL ".join(
+            f"SELECT {', '.join(f'{e[c]} AS {c}' for c in ['Time_Id'] + CONTAGENS + SOMAS)} FROM jogos j "
+            f"WHERE j.Liga_Id = (SELECT Id FROM ligas WHERE Nome = :liga) "
+            f"AND j.Data >= :desde AND j.Data < :ate"
+            for e in (_expressoes("j", True), _expressoes("j", False)))
+        origem = f"""
+            SELECT Time_Id, {", ".join(f"SUM(COALESCE({c}, 0)) AS {c}" for c in CONTAGENS + SOMAS)}
+            FROM ({lados}) GROUP BY Time_Id"""
+        params = {"liga": liga, "desde": desde or "", "ate": ate or "9999"}
+    else:
+        origem = f"""
+            SELECT Time_Id, {contagens} FROM estatisticas_times
+            WHERE Liga_Id = (SELECT Id FROM ligas WHERE Nome = :liga) AND Ano = :ano AND Jogos > 0"""
+        params = {"liga": liga, "ano": str(ano or pd.Timestamp.today().year)}
+    return pd.read_sql_query(f"""
+        SELECT t.Nome AS Time, {contagens}, Gols_Pro - Gols_Contra AS Saldo,
+            3 * Vitorias + Empates AS Pontos
+        FROM ({origem}) s JOIN times t ON t.Id = s.Time_Id
+        ORDER BY Pontos DESC, Saldo DESC, Gols_Pro DESC, Time""", conn, params=params)
+
+
+def features_jogos_do_dia(conn, jogos, n=5, data=None):
+    """
+    Uma linha por confronto da agenda (colunas data, liga, home, away) com as médias dos
+    últimos `n` jogos de cada equipa antes da data do jogo, prefixadas por Home_/Away_.
+    `jogos` é a agenda raspada ou um CSV de jogos_do_dia/ em qualquer dos formatos (os mais
+    antigos não têm a coluna data: passar a do nome do arquivo em `data`). Uma consulta
+    indexada por confronto; não lê o CSV do histórico.
+    """
+    jogos = pd.DataFrame(jogos)
+    if jogos.empty:
+        return pd.DataFrame()
+    if data is None and "data" not in jogos:
+        raise ValueError("features_jogos_do_dia: a agenda não tem a coluna 'data'; indique-a em `data`.")
+    linhas = []
+    for jogo in agenda._normalizar(jogos, data).to_dict("records"):
+        historico = pd.read_sql_query(SQL_CONFRONTO, conn, params={
+            "home": jogo["Home"], "away": jogo["Away"], "antes": jogo["Data"], "n": n})
+        linha = {"data": jogo["Data"], "liga": jogo["Liga"], "home": jogo["Home"], "away": jogo["Away"]}
+        for lado in ("home", "away"):
+            resumo = _resumo(historico[historico["Lado"] == lado])
+            linha.update({f"{lado.title()}_{c}": v for c, v in resumo.items()})
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
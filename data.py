@@ -1,5 +1,11 @@
 import pandas as pd
-from bs4 import BeautifulSoup
+import banco
+import parser_html
+import indice_ligas
+import auditoria
+import arquivo_paginas
+import concorrencia
+import metricas
 import ligas_config as cfg
 import time
 import logging
@@ -7,7 +13,7 @@ import csv
 from collections import Counter
 import os
 from datetime import date
-import unicodedata
+from urllib.parse import urljoin
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -28,15 +34,6 @@ dia = date.today() + timedelta(days=1)
 # ==========================
 # Utilitários
 # ==========================
-def _normalizar(texto: str) -> str:
-    """Remove acentos, transforma em lowercase e remove espaços extras."""
-    if not isinstance(texto, str):
-        return ""
-    texto = unicodedata.normalize("NFKD", texto).encode(
-        "ASCII", "ignore").decode("utf-8")
-    return " ".join(texto.lower().split())
-
-
 def _formatar_data(texto_data: str):
     if not texto_data or not isinstance(texto_data, str):
         return None
@@ -61,10 +58,46 @@ def _converter_stat_para_int(stat_string):
 # ==========================
 # Função de Raspagem
 # ==========================
+URL_AGENDA = "https://redscores.com/pt-br/futebol/amanha"
+
+
 def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
-    os.makedirs("jogos_faltando_time", exist_ok=True)
-    os.makedirs("jogos_duplicados", exist_ok=True)
-    os.makedirs("ligas_ignoradas", exist_ok=True)
+    try:
+        with metricas.registo.cronometro("selenium", "f1_pagina"):
+            driver.get(URL_AGENDA)
+            #driver.get("https://redscores.com/pt-br/")
+            # com page load strategy eager/none, "body" existe antes da agenda: espera-se pelos
+            # blocos de liga (ou pelo fim do carregamento, numa agenda sem jogos)
+            WebDriverWait(driver, 15).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, "div[id^='league_']")
+                or d.execute_script("return document.readyState") == "complete"
+            )
+            html = driver.page_source
+    except Exception as e:
+        log.error(f"[AGENDA] Falha geral: {e}")
+        return []
+    arquivo_paginas.arquivo.guardar(URL_AGENDA, "agenda", html, dia)
+    return extrair_jogos_agenda(html, ligas_permitidas_set)
+
+
+def _sem_auditoria(caminho, linha):
+    pass
+
+
+def extrair_jogos_agenda(html, ligas_permitidas_set, data_jogos=None, snapshot="snapshot_amanha.html",
+                         auditar=True):
+    """
+    Extrai os jogos (com odds e link do confronto) do HTML da agenda, sem duplicados.
+    `data_jogos` é a data dos jogos da página (por omissão, amanhã); sem blocos de liga, o HTML
+    é gravado em `snapshot` (None no reprocessamento a partir do arquivo). Com `auditar=False`
+    (reprocessamento) os CSVs de auditoria do dia não são tocados.
+    """
+    data_jogos = data_jogos or dia
+    registrar = auditoria.registrar if auditar else _sem_auditoria
+    if auditar:
+        os.makedirs("jogos_faltando_time", exist_ok=True)
+        os.makedirs("jogos_duplicados", exist_ok=True)
+        os.makedirs("ligas_ignoradas", exist_ok=True)
 
     data_hoje = date.today().strftime("%Y-%m-%d")
     arquivo_faltando = os.path.join(
@@ -75,18 +108,14 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
     arquivo_ignoradas = os.path.join(
         "ligas_ignoradas", f"ligas_ignoradas_{data_hoje}.csv")
 
+    indice = indice_ligas.indice_para(ligas_permitidas_set)
     jogos = []
     total_validos, total_incompletos, total_filtrados = 0, 0, 0
     times_unicos = set()
 
     try:
-        driver.get("https://redscores.com/pt-br/futebol/amanha")
-        #driver.get("https://redscores.com/pt-br/")
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "body"))
-        )
-        html = driver.page_source
-        soup = BeautifulSoup(html, "html.parser")
+        with metricas.registo.cronometro("parsing"):
+            soup = parser_html.sopa(html, parser_html.SO_LIGAS_AGENDA)
 
         blocos_liga = soup.select("div[id^='league_']")
         jogos_html = []
@@ -98,20 +127,19 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
                 nome_liga = f"{liga_pais.get_text(strip=True)} - {liga_nome.get_text(strip=True)}" if liga_pais else liga_nome.get_text(
                     strip=True)
 
-                if _normalizar(nome_liga) not in {_normalizar(l) for l in ligas_permitidas_set}:
+                if not indice.permitida(nome_liga):
                     total_filtrados += 1
-                    with open(arquivo_ignoradas, "a", newline="", encoding="utf-8") as f:
-                        csv.writer(f).writerow([nome_liga])
+                    registrar(arquivo_ignoradas, [nome_liga])
                     continue
 
                 jogos_bloco = bloco.select("tbody[id^='xmatch_']")
                 for corpo in jogos_bloco:
                     jogos_html.append((nome_liga, corpo))
 
-        if not jogos_html:
+        if not jogos_html and snapshot:
             log.warning(
                 "[AGENDA] Nenhum bloco de liga encontrado. Salvando snapshot...")
-            with open("snapshot_amanha.html", "w", encoding="utf-8") as f:
+            with open(snapshot, "w", encoding="utf-8") as f:
                 f.write(html)
 
         for nome_liga, jogo in jogos_html:
@@ -125,9 +153,8 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
 
                 if not all([hora_texto, home, away, link_url]):
                     total_incompletos += 1
-                    with open(arquivo_incompletos, "a", newline="", encoding="utf-8") as f:
-                        csv.writer(f).writerow(
-                            [nome_liga, hora_texto, home, away, link_url])
+                    registrar(
+                        arquivo_incompletos, [nome_liga, hora_texto, home, away, link_url])
                     continue
                 
                 # Inicializa as odds como None
@@ -151,7 +178,7 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
                     log.warning(f"[ODDS] Odds não encontradas para {home} vs {away}. Motivo: {e}")
 
                 jogos.append({
-                    "data": dia,
+                    "data": data_jogos,
                     "liga": nome_liga,
                     "hora": hora_texto,
                     "home": home,
@@ -166,8 +193,7 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
             except Exception as e:
                 total_incompletos += 1
                 log.error(f"[AGENDA] Erro ao processar jogo: {e}")
-                with open(arquivo_incompletos, "a", newline="", encoding="utf-8") as f:
-                    csv.writer(f).writerow([nome_liga, "ERRO", str(e)])
+                registrar(arquivo_incompletos, [nome_liga, "ERRO", str(e)])
 
         # Auditoria de times
         contador_times = Counter()
@@ -179,6 +205,7 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
         if total_times_contados != len(jogos) * 2:
             log.warning(
                 f"[AGENDA] ⚠️ Diferença detectada: {total_times_contados} vs esperado {len(jogos) * 2}")
+        if total_times_contados != len(jogos) * 2 and auditar:
             with open(os.path.join("jogos_faltando_time", f"auditoria_times_{data_hoje}.csv"), "w", newline="", encoding="utf-8") as f:
                 writer = csv.writer(f)
                 writer.writerow(["Time", "Ocorrencias"])
@@ -190,9 +217,9 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
         duplicatas = []
         
         # Manter o log de itens descartados
-        with open(arquivo_duplicados, "w", newline="", encoding="utf-8") as f:
-            # Escreve o cabeçalho no arquivo de duplicados
-            csv.writer(f).writerow(["liga", "hora", "home", "away", "link_confronto", "motivo"])
+        # Escreve o cabeçalho no arquivo de duplicados
+        if auditar:
+            auditoria.novo(arquivo_duplicados, ["liga", "hora", "home", "away", "link_confronto", "motivo"])
 
         for jogo_atual in jogos:
             chave = (jogo_atual.get("liga"), jogo_atual.get("hora"), jogo_atual.get("home"), jogo_atual.get("away"))
@@ -212,12 +239,10 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
                     jogos_unicos_dict[chave] = jogo_atual
                     
                     # Logamos o jogo antigo como "substituído por versão com odds"
-                    with open(arquivo_duplicados, "a", newline="", encoding="utf-8") as f:
-                        csv.writer(f).writerow([*chave, jogo_existente.get("link_confronto", "N/A"), "Substituído por versão com odds"])
+                    registrar(arquivo_duplicados, [*chave, jogo_existente.get("link_confronto", "N/A"), "Substituído por versão com odds"])
                 else:
                     # mantemos a primeira versão que encontrámos e descartamos a nova.
-                    with open(arquivo_duplicados, "a", newline="", encoding="utf-8") as f:
-                        csv.writer(f).writerow([*chave, jogo_atual.get("link_confronto", "N/A"), "Duplicado sem prioridade"])
+                    registrar(arquivo_duplicados, [*chave, jogo_atual.get("link_confronto", "N/A"), "Duplicado sem prioridade"])
 
         # No final, a lista de jogos únicos e de melhor qualidade são os valores do nosso dicionário.
         jogos_unicos = list(jogos_unicos_dict.values())
@@ -230,18 +255,43 @@ def raspar_jogos_de_amanha(driver, ligas_permitidas_set):
         log.error(f"[AGENDA] Falha geral: {e}")
         return []
 
+# ==========================
+# Links das equipes a partir do HTML do confronto
+# ==========================
+@metricas.registo.cronometro("parsing")
+def extrair_links_equipes(html):
+    """
+    Extrai (home_link, away_link) do HTML da página de um confronto.
+    Retorna (None, None) se os anchors esperados não estiverem no HTML.
+    """
+    soup = parser_html.sopa(html, parser_html.SO_EQUIPAS_CONFRONTO)
+    anchors = soup.select(
+        "div.match-detail__teams a, div.match-detail__name a, div.match-detail__team a")
+    if len(anchors) >= 2:
+        home = urljoin("https://redscores.com", anchors[0].get('href'))
+        away = urljoin("https://redscores.com", anchors[1].get('href'))
+        return home, away
+    return None, None
+
 # ==========================
 # Obter links de equipes com retry
 # ==========================
 def obter_links_equipes_confronto(driver, url_confronto, tentativas=2):
     for tentativa in range(tentativas):
         try:
-            driver.get(url_confronto)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "div.match-detail__teams"))
-            )
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+            # a retentativa espera pelo slot do controlador (que alarga o intervalo após um erro);
+            # o cronómetro só começa com o slot: a espera na fila não conta como tempo de Selenium
+            with concorrencia.redscore.pedido(concorrencia.LATENCIA_ALVO_SELENIUM_S), \
+                    metricas.registo.cronometro("selenium", "f2_selenium"):
+                driver.get(url_confronto)
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, "div.match-detail__teams"))
+                )
+                html = driver.page_source
+            arquivo_paginas.arquivo.guardar(url_confronto, "confronto", html)
+            with metricas.registo.cronometro("parsing"):
+                soup = parser_html.sopa(html, parser_html.SO_EQUIPAS_CONFRONTO)
             links_equipes = soup.select(
                 "div.match-detail__teams a, div.match-detail__name a")
             if len(links_equipes) >= 2:
@@ -249,113 +299,247 @@ def obter_links_equipes_confronto(driver, url_confronto, tentativas=2):
         except Exception as e:
             log.warning(
                 f"[CONFRONTO] Tentativa {tentativa+1} falhou para {url_confronto}: {e}")
-            time.sleep(2)
+            metricas.registo.contar("f2_selenium_retentativas")
     log.error(
         f"[CONFRONTO] Falhou após {tentativas} tentativas: {url_confronto}")
-    with open("jogos_incompletos.csv", "a", newline="", encoding="utf-8") as f:
-        csv.writer(f).writerow([url_confronto, "LINKS_NAO_ENCONTRADOS"])
+    auditoria.registrar("jogos_incompletos.csv", [url_confronto, "LINKS_NAO_ENCONTRADOS"])
     return None, None
 
 # ==========================
 # Raspar dados do time
 # ==========================
-def raspar_dados_time(driver, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, limite_jogos=cfg.LIMITE_JOGOS_POR_TIME):
-    jogos_raspados = []
+MARCA_GRELHA_TIME = "match-grid__bottom"
+
+
+def extrair_grelha_time(html, liga_principal, jogos_existentes, ligas_permitidas_set, ultima_data=None):
+    """
+    Parsing puro da grelha de histórico (sem métricas, auditoria nem log: pode correr num
+    processo de parsing, ver parsing_paralelo). A grelha vem do mais recente para o mais
+    antigo: com `ultima_data` (marca da equipa, "YYYY-MM-DD"), a leitura pára no primeiro
+    jogo anterior a essa data.
+    Retorna (jogos, linhas_lidas, erros) ou None se a grelha não estiver presente no HTML.
+    """
+    soup = parser_html.sopa(html, parser_html.SO_GRELHA_TIME)
+    if soup.select_one("div.match-grid__bottom") is None:
+        return None
+    indice = indice_ligas.indice_para(ligas_permitidas_set)
+    jogos_raspados, lidas, erros = [], 0, []
+    for linha in soup.select("div.match-grid__bottom tbody tr"):
+        try:
+            celulas = linha.find_all('td')
+            if len(celulas) <= 10:
+                continue
+            lidas += 1
+            liga_img = celulas[1].find('img')
+            liga_local = liga_img['alt'].strip() if liga_img else ''
+            if not liga_local:
+                continue
+
+            liga_final = indice.liga_da_linha(liga_local, liga_principal)
+            if not liga_final:
+                continue
+
+            data = celulas[0].text.strip()
+            time_casa = celulas[2].text.strip()
+            time_fora = celulas[4].text.strip()
+            data_padronizada = _formatar_data(data)
+            if ultima_data and data_padronizada and data_padronizada < ultima_data:
+                break  # daqui para baixo já está tudo no banco
+            # mesma normalização de processar_dados_raspados (a das chaves gravadas)
+            if (data_padronizada, banco.nome_canonico(time_casa), banco.nome_canonico(time_fora)) in jogos_existentes:
+                continue  # <-- não interrompe raspagem de outros jogos
+
+            jogos_raspados.append({
+                "Liga": liga_final, "Data": data, "Home": time_casa, "Away": time_fora,
+                "Placar_FT": celulas[3].text.strip(),
+                "Placar_HT": celulas[5].text.strip(),
+                "Chutes": celulas[6].text.strip(),
+                "Chutes_Gol": celulas[7].text.strip(),
+                "Ataques": celulas[8].text.strip(),
+                "Escanteios": celulas[9].text.strip(),
+                "Odd_H_str": celulas[11].text.strip(),
+                "Odd_D_str": celulas[12].text.strip(),
+                "Odd_A_str": celulas[13].text.strip()
+            })
+        except Exception as e:
+            erros.append(str(e))
+    return jogos_raspados, lidas, erros
+
+
+def registar_grelha_time(time_url, grelha):
+    """Regista no processo principal (log, auditoria, métricas) o resultado de extrair_grelha_time."""
+    if grelha is None:
+        return None
+    jogos_raspados, lidas, erros = grelha
+    for erro in erros:
+        log.error(f"[TIME] Erro ao processar linha em {time_url}: {erro}")
+        auditoria.registrar("erros_raspagem_times.csv", [time_url, erro])
+    metricas.registo.equipa(time_url, lidas, len(jogos_raspados))
+    return jogos_raspados
+
+
+@metricas.registo.cronometro("parsing")
+def extrair_jogos_time(html, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, ultima_data=None):
+    """
+    Extrai os jogos da grelha de histórico a partir do HTML da página do time.
+    Retorna None se a grelha (div.match-grid__bottom) não estiver presente no HTML.
+    """
+    return registar_grelha_time(
+        time_url, extrair_grelha_time(html, liga_principal, jogos_existentes, ligas_permitidas_set, ultima_data))
+
+
+def obter_html_time_por_requests(session, time_url, liga_principal, timeout=20):
+    """
+    Busca a página do time via HTTP (requests, com os cookies do login), sem a interpretar.
+    Retorna None quando a página precisa do Selenium (resposta inválida ou grelha ausente no HTML).
+    """
     try:
-        driver.get(time_url)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located(
-            (By.CSS_SELECTOR, "div.match-grid__bottom")))
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        for linha in soup.select("div.match-grid__bottom tbody tr"):
-            try:
-                celulas = linha.find_all('td')
-                if len(celulas) <= 10:
-                    continue
-                liga_img = celulas[1].find('img')
-                liga_local = liga_img['alt'].strip() if liga_img else ''
-                if not liga_local:
-                    continue
+        with concorrencia.redscore.pedido() as pedido, metricas.registo.cronometro("rede", "f3_pedido"):
+            resp = session.get(time_url, timeout=timeout)
+            pedido.resposta(resp)
+    except Exception as e:
+        log.warning(f"[TIME] Falha HTTP ao abrir {time_url}: {e}")
+        return None
+    if resp.status_code != 200 or not resp.text:
+        return None
+    arquivo_paginas.arquivo.guardar(time_url, "time", resp.text, liga_principal)
+    return resp.text if MARCA_GRELHA_TIME in resp.text else None
 
-                liga_final = None
-                if liga_local.lower() in liga_principal.lower():
-                    liga_final = liga_principal
-                else:
-                    for liga_permitida in ligas_permitidas_set:
-                        if liga_local.lower() in liga_permitida.lower():
-                            liga_final = liga_permitida
-                            break
-                if not liga_final:
-                    continue
 
-                data = celulas[0].text.strip()
-                time_casa = celulas[2].text.strip()
-                time_fora = celulas[4].text.strip()
-                data_padronizada = _formatar_data(data)
-                home_norm, away_norm = " ".join(
-                    time_casa.split()).title(), " ".join(time_fora.split()).title()
-                if (data_padronizada, home_norm, away_norm) in jogos_existentes:
-                    continue  # <-- não interrompe raspagem de outros jogos
-
-                jogos_raspados.append({
-                    "Liga": liga_final, "Data": data, "Home": time_casa, "Away": time_fora,
-                    "Placar_FT": celulas[3].text.strip(),
-                    "Placar_HT": celulas[5].text.strip(),
-                    "Chutes": celulas[6].text.strip(),
-                    "Chutes_Gol": celulas[7].text.strip(),
-                    "Ataques": celulas[8].text.strip(),
-                    "Escanteios": celulas[9].text.strip(),
-                    "Odd_H_str": celulas[11].text.strip(),
-                    "Odd_D_str": celulas[12].text.strip(),
-                    "Odd_A_str": celulas[13].text.strip()
-                })
-            except Exception as e:
-                log.error(f"[TIME] Erro ao processar linha em {time_url}: {e}")
-                with open("erros_raspagem_times.csv", "a", newline="", encoding="utf-8") as f:
-                    csv.writer(f).writerow([time_url, str(e)])
+def obter_html_time(driver, time_url, liga_principal):
+    """Renderiza a página do time com o Selenium até a grelha aparecer; None se falhar."""
+    try:
+        with concorrencia.redscore.pedido(concorrencia.LATENCIA_ALVO_SELENIUM_S), \
+                metricas.registo.cronometro("selenium", "f3_selenium"):
+            driver.get(time_url)
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "div.match-grid__bottom")))
+            html = driver.page_source
     except Exception as e:
         log.error(f"[TIME] Falha geral ao abrir {time_url}: {e}")
-    return jogos_raspados
+        return None
+    arquivo_paginas.arquivo.guardar(time_url, "time", html, liga_principal)
+    return html
+
+
+def raspar_dados_time_por_requests(session, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, timeout=20, ultima_data=None):
+    """
+    Busca a página do time via HTTP e extrai a grelha.
+    Retorna None quando a página precisa do Selenium (resposta inválida ou grelha ausente no HTML).
+    """
+    html = obter_html_time_por_requests(session, time_url, liga_principal, timeout)
+    if html is None:
+        return None
+    return extrair_jogos_time(html, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, ultima_data)
+
+
+def raspar_dados_time(driver, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, limite_jogos=cfg.LIMITE_JOGOS_POR_TIME, session=None, ultima_data=None):
+    # 1) tenta via requests; 2) só renderiza com Selenium se o HTML não trouxer a grelha
+    if session is not None:
+        jogos_raspados = raspar_dados_time_por_requests(
+            session, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, ultima_data=ultima_data)
+        if jogos_raspados is not None:
+            return jogos_raspados
+        log.info(f"[TIME] Grelha ausente via HTTP, a usar Selenium: {time_url}")
+
+    html = obter_html_time(driver, time_url, liga_principal)
+    if html is None:
+        return []
+    return extrair_jogos_time(
+        html, time_url, liga_principal, jogos_existentes, ligas_permitidas_set, ultima_data) or []
 
 # ==========================
 # Processamento dos dados
 # ==========================
-def processar_dados_raspados(lista_de_jogos):
-    jogos_processados, descartados = [], []
-    for jogo in lista_de_jogos:
-        try:
-            data_padronizada = _formatar_data(jogo['Data'])
-            if not data_padronizada:
-                descartados.append(jogo)
-                continue
-            jogos_processados.append({
-                "Liga": " ".join(jogo['Liga'].split()).title(),
-                "Data": data_padronizada,
-                "Home": " ".join(jogo['Home'].split()),
-                "Away": " ".join(jogo['Away'].split()),
-                "H_Gols_FT": _converter_stat_para_int(jogo['Placar_FT'])[0],
-                "A_Gols_FT": _converter_stat_para_int(jogo['Placar_FT'])[1],
-                "H_Gols_HT": _converter_stat_para_int(jogo['Placar_HT'])[0],
-                "A_Gols_HT": _converter_stat_para_int(jogo['Placar_HT'])[1],
-                "H_Chute": _converter_stat_para_int(jogo['Chutes'])[0],
-                "A_Chute": _converter_stat_para_int(jogo['Chutes'])[1],
-                "H_Chute_Gol": _converter_stat_para_int(jogo['Chutes_Gol'])[0],
-                "A_Chute_Gol": _converter_stat_para_int(jogo['Chutes_Gol'])[1],
-                "H_Ataques": _converter_stat_para_int(jogo['Ataques'])[0],
-                "A_Ataques": _converter_stat_para_int(jogo['Ataques'])[1],
-                "H_Escanteios": _converter_stat_para_int(jogo['Escanteios'])[0],
-                "A_Escanteios": _converter_stat_para_int(jogo['Escanteios'])[1],
-                "Odd_H": float(jogo['Odd_H_str']) if jogo['Odd_H_str'] not in [None, "-"] else 0.0,
-                "Odd_D": float(jogo['Odd_D_str']) if jogo['Odd_D_str'] not in [None, "-"] else 0.0,
-                "Odd_A": float(jogo['Odd_A_str']) if jogo['Odd_A_str'] not in [None, "-"] else 0.0,
-            })
-        except Exception as e:
-            descartados.append(jogo)
-            log.error(f"[PROCESSAMENTO] Falha ao processar jogo: {e}")
-    if descartados:
-        with open(f"jogos_processamento_falhos_{date.today()}.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=descartados[0].keys())
-            writer.writeheader()
-            writer.writerows(descartados)
-        log.warning(
-            f"[PROCESSAMENTO] {len(descartados)} jogos descartados. CSV salvo.")
-    return pd.DataFrame(jogos_processados)
\ No newline at end of file
+CAMPOS_RASPADOS = ["Liga", "Data", "Home", "Away", "Placar_FT", "Placar_HT", "Chutes",
+                   "Chutes_Gol", "Ataques", "Escanteios", "Odd_H_str", "Odd_D_str", "Odd_A_str"]
+STATS_RASPADAS = {
+    "Placar_FT": ("H_Gols_FT", "A_Gols_FT"),
+    "Placar_HT": ("H_Gols_HT", "A_Gols_HT"),
+    "Chutes": ("H_Chute", "A_Chute"),
+    "Chutes_Gol": ("H_Chute_Gol", "A_Chute_Gol"),
+    "Ataques": ("H_Ataques", "A_Ataques"),
+    "Escanteios": ("H_Escanteios", "A_Escanteios"),
+}
+ODDS_RASPADAS = {"Odd_H_str": "Odd_H", "Odd_D_str": "Odd_D", "Odd_A_str": "Odd_A"}
+
+
+def _texto(coluna):
+    """Série só com as strings; o resto (None, NaN, números) vira NaN."""
+    return coluna.where(coluna.map(lambda v: isinstance(v, str)))
+
+
+def _nomes_canonicos(coluna):
+    """Versão vetorizada de banco.nome_canonico."""
+    return _texto(coluna).str.split().str.join(" ")
+
+
+def _formatar_datas(coluna):
+    """Versão vetorizada de _formatar_data: "YYYY-MM-DD" ou NaN."""
+    # cada texto distinto é lido uma vez, por _formatar_data: num lote com formatos misturados,
+    # pd.to_datetime de uma coluna imporia a todas as linhas o formato inferido pela primeira
+    textos = _texto(coluna)
+    unicos = textos.dropna().unique()
+    return textos.map(dict(zip(unicos, map(_formatar_data, unicos))))
+
+
+def _converter_stats_para_int(coluna):
+    """Versão vetorizada de _converter_stat_para_int: DataFrame com as colunas (casa, fora)."""
+    partes = _texto(coluna).str.extract(r"^\s*\+?(\d+)\s*-\s*\+?(\d+)\s*$")
+    return partes.astype("float64").fillna(0).astype("int64")
+
+
+def _converter_odds(coluna):
+    """float(odd), 0.0 para None/"-"; NaN onde float() falharia (o jogo é descartado)."""
+    vazias = coluna.isna() | (coluna == "-")
+    return pd.to_numeric(coluna.where(~vazias, "0"), errors="coerce")
+
+
+def gravar_jogos_descartados(descartados):
+    with open(f"jogos_processamento_falhos_{date.today()}.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=descartados[0].keys())
+        writer.writeheader()
+        writer.writerows(descartados)
+    log.warning(
+        f"[PROCESSAMENTO] {len(descartados)} jogos descartados. CSV salvo.")
+
+
+def processar_dados_raspados(lista_de_jogos, descartados=None):
+    """
+    Converte os jogos raspados (dicts de strings) no DataFrame da tabela 'jogos', coluna a coluna.
+    Jogos com data inválida, campos em falta ou odds não numéricas vão para o CSV de descartados;
+    com a lista `descartados`, são acrescentados a ela (o chamador grava o CSV no fim).
+    """
+    if not lista_de_jogos:
+        return pd.DataFrame()
+    df = pd.DataFrame(lista_de_jogos)
+    # um jogo sem algum dos campos raspados falharia com KeyError: descartado
+    descartar = pd.Series([not set(CAMPOS_RASPADOS) <= jogo.keys() for jogo in lista_de_jogos], index=df.index)
+    for campo in CAMPOS_RASPADOS:
+        if campo not in df:
+            df[campo] = None
+
+    datas = _formatar_datas(df["Data"])
+    descartar |= datas.isna()
+    processados = pd.DataFrame(index=df.index)
+    processados["Liga"] = _texto(df["Liga"]).str.split().str.join(" ").str.title()
+    processados["Data"] = datas
+    processados["Home"] = _nomes_canonicos(df["Home"])
+    processados["Away"] = _nomes_canonicos(df["Away"])
+    descartar |= processados[["Liga", "Home", "Away"]].isna().any(axis=1)
+    for campo, (col_h, col_a) in STATS_RASPADAS.items():
+        processados[[col_h, col_a]] = _converter_stats_para_int(df[campo]).to_numpy()
+    for campo, col in ODDS_RASPADAS.items():
+        processados[col] = _converter_odds(df[campo])
+        descartar |= processados[col].isna()
+
+    if descartar.any():
+        falhos = [jogo for jogo, fora in zip(lista_de_jogos, descartar) if fora]
+        if descartados is None:
+            gravar_jogos_descartados(falhos)
+        else:
+            descartados.extend(falhos)
+    processados = processados[~descartar]
+    if processados.empty:
+        return pd.DataFrame()
+    return processados.reset_index(drop=True)
@@ -0,0 +1,105 @@
+import csv
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+import banco
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+LINHAS_POR_BLOCO = 20000           # linhas lidas do SQLite por bloco ao exportar
+# ================================
+
+
+# ================================
+# Marcas de exportação (dados.db)
+# ================================
+def inicializar_exportacoes(conn):
+    # por ficheiro exportado: maior rowid de 'jogos' que já está no ficheiro
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS exportacoes (
+        Arquivo TEXT PRIMARY KEY, Ultimo_Rowid INTEGER, Atualizado_Em TEXT
+    )""")
+    conn.commit()
+
+
+def _ultimo_rowid_exportado(conn, arquivo):
+    row = conn.execute(
+        "SELECT Ultimo_Rowid FROM exportacoes WHERE Arquivo = ?", (arquivo,)).fetchone()
+    return row[0] if row else None
+
+
+def _gravar_marca(conn, arquivo, ultimo_rowid):
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO exportacoes VALUES (?, ?, ?)",
+                     (arquivo, ultimo_rowid, agora))
+
+
+# ================================
+# Exportação
+# ================================
+def _blocos(conn, ate_rowid, desde_rowid=0):
+    return pd.read_sql_query(
+        f"SELECT {', '.join(banco.COLUNAS_JOGOS)} FROM jogos_completos WHERE Id > ? AND Id <= ? ORDER BY Id",
+        conn, params=(desde_rowid, ate_rowid), chunksize=LINHAS_POR_BLOCO)
+
+
+def exportar_csv(conn, nome_csv, completo=False):
+    """
+    Exporta 'jogos' (pela vista jogos_completos, com os nomes) para CSV. Por omissão acrescenta
+    só as linhas inseridas desde a última exportação deste ficheiro; com `completo` (ou sem marca/ficheiro) reescreve tudo em blocos,
+    sem carregar a tabela inteira em memória.
+    Retorna (linhas_escritas, completo).
+    """
+    ate_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM jogos").fetchone()[0]
+    desde_rowid = _ultimo_rowid_exportado(conn, nome_csv)
+    completo = completo or desde_rowid is None or not os.path.exists(nome_csv)
+
+    total = 0
+    if completo:
+        temporario = nome_csv + ".tmp"
+        with open(temporario, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f, lineterminator=os.linesep).writerow(banco.COLUNAS_JOGOS)
+            for bloco in _blocos(conn, ate_rowid):
+                bloco.to_csv(f, index=False, header=False)
+                total += len(bloco)
+        os.replace(temporario, nome_csv)
+    else:
+        with open(nome_csv, "a", newline="", encoding="utf-8") as f:
+            for bloco in _blocos(conn, ate_rowid, desde_rowid):
+                bloco.to_csv(f, index=False, header=False)
+                total += len(bloco)
+    _gravar_marca(conn, nome_csv, ate_rowid)
+    return total, completo
+
+
+def exportar_parquet(conn, nome_parquet):
+    """Snapshot completo de 'jogos' em Parquet (zstd), escrito em blocos. Requer pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        log.warning("[EXPORT] pyarrow não instalado; snapshot Parquet ignorado.")
+        return 0
+    ate_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM jogos").fetchone()[0]
+    temporario = nome_parquet + ".tmp"
+    writer, total = None, 0
+    try:
+        for bloco in _blocos(conn, ate_rowid):
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(temporario, tabela.schema, compression="zstd")
+            writer.write_table(tabela.cast(writer.schema))
+            total += len(bloco)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(temporario, nome_parquet)
+    return total
@@ -0,0 +1,117 @@
+import logging
+import queue
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import banco
+import data as dt
+import indice_jogos
+import metricas
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+LINHAS_POR_LOTE = 500              # linhas processadas acumuladas antes de cada UPSERT
+EQUIPAS_EM_ESPERA = 64             # equipas na fila do escritor antes de os workers esperarem
+ESPERA_FILA_S = 1.0                # com a fila cheia, de quanto em quanto tempo se verifica o escritor
+# ================================
+
+
+class GravacaoContinua:
+    """
+    Fases 3-4 em streaming: cada equipa raspada entra numa fila; uma thread de fundo (com conexão
+    própria) processa as linhas, descarta chaves já gravadas nesta execução e faz UPSERT em lotes
+    de LINHAS_POR_LOTE. Só depois de cada lote estar no banco é que as marcas dessas equipas
+    avançam e elas ficam concluídas no checkpoint. A memória não cresce com o número de equipas.
+    """
+
+    def __init__(self, nome_db, ck=None, linhas_por_lote=LINHAS_POR_LOTE):
+        self.nome_db = nome_db
+        self.ck = ck
+        self.linhas_por_lote = linhas_por_lote
+        self.raspados = self.inseridos = self.atualizados = 0
+        self._fila = queue.Queue(maxsize=EQUIPAS_EM_ESPERA)
+        self._erro = None
+        self._thread = threading.Thread(target=self._escritor, name="gravacao", daemon=True)
+        self._thread.start()
+
+    def receber(self, url, jogos, marca=None):
+        """Entrega os jogos raspados de uma equipa (é o `ao_concluir` da fase 3; chamável de qualquer thread)."""
+        if not self._entregar((url, jogos, marca)):
+            raise RuntimeError(f"Gravação interrompida: {self._erro or 'escritor terminado'}")
+
+    def finalizar(self):
+        """Grava o último lote, espera pela thread e retorna (raspados, inseridos, atualizados)."""
+        self._entregar(None)
+        self._thread.join()
+        if self._erro:
+            raise RuntimeError(f"Gravação interrompida: {self._erro}")
+        return self.raspados, self.inseridos, self.atualizados
+
+    def _entregar(self, item):
+        # com o escritor parado ninguém consome a fila: nunca esperar por ela sem prazo
+        while self._thread.is_alive() and not self._erro:
+            try:
+                self._fila.put(item, timeout=ESPERA_FILA_S)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _escritor(self):
+        conn = banco.conectar(self.nome_db)
+        vistos = indice_jogos.IndiceJogos()     # chaves já gravadas nesta execução
+        lote, equipas, linhas = [], {}, 0
+        descartados = []
+        try:
+            while True:
+                item = self._fila.get()
+                if item is None:
+                    break
+                url, jogos, marca = item
+                self.raspados += len(jogos)
+                df = dt.processar_dados_raspados(jogos, descartados) if jogos else pd.DataFrame()
+                if not df.empty:
+                    df = df.drop_duplicates(subset=banco.CHAVE_JOGOS, keep="last")
+                    df = df[~vistos.contem(df)]
+                    vistos.adicionar(df)
+                    lote.append(df)
+                    linhas += len(df)
+                equipas[url] = marca
+                if linhas >= self.linhas_por_lote:
+                    self._gravar_lote(conn, lote, equipas)
+                    lote, equipas, linhas = [], {}, 0
+            self._gravar_lote(conn, lote, equipas)
+        except Exception as e:
+            self._erro = e
+            log.error(f"[GRAVACAO] Falha ao gravar lote: {e}")
+            # os workers não podem ficar bloqueados numa fila que já ninguém consome
+            while True:
+                try:
+                    self._fila.get_nowait()
+                except queue.Empty:
+                    break
+        finally:
+            conn.close()
+            if descartados:
+                dt.gravar_jogos_descartados(descartados)
+
+    def _gravar_lote(self, conn, lote, equipas):
+        if not equipas:
+            return
+        with metricas.registo.cronometro("db"):
+            if lote:
+                inseridos, atualizados = banco.upsert_jogos(conn, pd.concat(lote, ignore_index=True))
+                self.inseridos += inseridos
+                self.atualizados += atualizados
+            # a marca só avança depois de os jogos da equipa estarem no banco
+            marcas = {url: marca for url, marca in equipas.items() if marca}
+            banco.atualizar_marcas_equipas(conn, marcas, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        if self.ck:
+            self.ck.concluir_equipas(equipas.keys())
+        log.info(f"[GRAVACAO] Lote gravado: {len(equipas)} equipas "
+                 f"(total: {self.inseridos} novos, {self.atualizados} atualizados).")
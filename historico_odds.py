@@ -0,0 +1,87 @@
+"""
+Série temporal das odds de cada jogo (chave (Data, Home_Id, Away_Id), a mesma de 'agenda' e 'jogos').
+
+Os snapshots são gravados por triggers, só quando as odds mudam de facto:
+  - Fonte 'agenda': odds pré-jogo, a cada gravação da agenda (rotina noturna ou --odds);
+  - Fonte 'final': odds de fecho, lidas da página do time quando o jogo entra em 'jogos'.
+"""
+import logging
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+_AGORA = "strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')"
+_MUDOU = "OLD.Odd_H IS NOT NEW.Odd_H OR OLD.Odd_D IS NOT NEW.Odd_D OR OLD.Odd_A IS NOT NEW.Odd_A"
+_TEM_ODDS = "COALESCE(NEW.Odd_H, NEW.Odd_D, NEW.Odd_A) IS NOT NULL"
+
+
+def _sql_snapshot(fonte):
+    return f"""
+        INSERT OR REPLACE INTO odds_historico VALUES
+            (NEW.Data, NEW.Home_Id, NEW.Away_Id, {_AGORA}, '{fonte}', NEW.Odd_H, NEW.Odd_D, NEW.Odd_A);"""
+
+
+def inicializar_historico_odds(conn):
+    """
+    Cria 'odds_historico' e os triggers em 'agenda' e 'jogos' (chamar depois de criar ambas).
+    Na criação, é semeada com as odds já gravadas; a hora de captura desses snapshots não é
+    conhecida: usa-se a véspera (agenda) e o dia do jogo (final).
+    """
+    nova = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'odds_historico'").fetchone()
+    with conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS odds_historico (
+            Data TEXT NOT NULL, Home_Id INTEGER NOT NULL, Away_Id INTEGER NOT NULL,
+            Capturado_Em TEXT NOT NULL, Fonte TEXT NOT NULL, Odd_H REAL, Odd_D REAL, Odd_A REAL,
+            PRIMARY KEY (Data, Home_Id, Away_Id, Capturado_Em, Fonte)
+        ) WITHOUT ROWID""")
+        for tabela, fonte in (("agenda", "agenda"), ("jogos", "final")):
+            conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_odds_insert AFTER INSERT ON {tabela}
+            WHEN {_TEM_ODDS} BEGIN {_sql_snapshot(fonte)} END""")
+            conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_odds_update AFTER UPDATE OF Odd_H, Odd_D, Odd_A ON {tabela}
+            WHEN ({_MUDOU}) AND {_TEM_ODDS} BEGIN {_sql_snapshot(fonte)} END""")
+        if nova:
+            conn.execute("""
+            INSERT OR IGNORE INTO odds_historico
+            SELECT Data, Home_Id, Away_Id, date(Data, '-1 day'), 'agenda', Odd_H, Odd_D, Odd_A
+            FROM agenda WHERE COALESCE(Odd_H, Odd_D, Odd_A) IS NOT NULL""")
+            conn.execute("""
+            INSERT OR IGNORE INTO odds_historico
+            SELECT Data, Home_Id, Away_Id, Data, 'final', Odd_H, Odd_D, Odd_A
+            FROM jogos WHERE COALESCE(Odd_H, Odd_D, Odd_A) IS NOT NULL""")
+    if nova:
+        log.info("[ODDS] Tabela odds_historico criada a partir de 'agenda' e 'jogos'.")
+
+
+def carregar_historico(conn, desde=None, ate=None):
+    """Todos os snapshots dos jogos entre `desde` e `ate` ("YYYY-MM-DD", inclusivos), com nomes."""
+    return pd.read_sql_query("""
+        SELECT o.Data, h.Nome AS Home, a.Nome AS Away, o.Capturado_Em, o.Fonte, o.Odd_H, o.Odd_D, o.Odd_A
+        FROM odds_historico o
+        JOIN times h ON h.Id = o.Home_Id
+        JOIN times a ON a.Id = o.Away_Id
+        WHERE o.Data >= ? AND o.Data <= ?
+        ORDER BY o.Data, o.Home_Id, o.Away_Id, o.Capturado_Em""",
+        conn, params=(desde or "", ate or "9999"))
+
+
+def movimento_odds(conn, desde=None, ate=None):
+    """
+    Uma linha por jogo: odds de abertura (primeiro snapshot da agenda), última pré-jogo,
+    odds de fecho ('final') e o número de mudanças registadas antes do jogo.
+    """
+    historico = carregar_historico(conn, desde, ate)
+    chave = ["Data", "Home", "Away"]
+    odds = ["Odd_H", "Odd_D", "Odd_A"]
+    pre = historico[historico["Fonte"] == "agenda"].groupby(chave)
+    resultado = pd.concat([
+        pre[odds].first().add_suffix("_Abertura"),
+        pre[odds].last().add_suffix("_Pre"),
+        pre.size().rename("Mudancas") - 1,
+        historico[historico["Fonte"] == "final"].groupby(chave)[odds].last().add_suffix("_Fecho"),
+    ], axis=1)
+    return resultado.reset_index()
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import random
+import httpx
+import arquivo_paginas
+import concorrencia
+import data as dt
+import metricas
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+STATUS_SESSAO_RECUSADA = {401, 403}    # a sessão do browser pode ter acesso onde o HTTP não tem
+TENTATIVAS_HTTP = 4
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 20
+# ================================
+
+
+def _tempo_backoff(tentativa, resp=None):
+    """Backoff exponencial com jitter; respeita Retry-After (em segundos) quando presente."""
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_S)
+    espera = BACKOFF_BASE_S * (2 ** tentativa)
+    return min(espera + random.uniform(0, BACKOFF_BASE_S), BACKOFF_MAX_S)
+
+
+async def _resolver_um(client, controlador, url, tentativas, parsing=None):
+    """
+    Resolve os links das equipas de um confronto. Retorna:
+      ("OK", url, home, away)   -> links encontrados
+      ("FALLBACK", url)         -> página obtida mas sem os anchors esperados
+      ("ERROR", url, motivo)    -> falha HTTP/rede após esgotar as tentativas (ou erro não retentável)
+    Nunca levanta exceções: um confronto problemático não interrompe a fase 2.
+    """
+    motivo = "sem_tentativas"
+    for tentativa in range(tentativas):
+        resp = None
+        try:
+            async with controlador.pedido_async() as pedido:
+                with metricas.registo.cronometro("rede", "f2_pedido"):
+                    resp = await client.get(url)
+                pedido.resposta(resp)
+            if resp.status_code == 200 and resp.text:
+                arquivo_paginas.arquivo.guardar(url, "confronto", resp.text)
+                if parsing is not None:
+                    home, away = await parsing.links_confronto(resp.text)
+                else:
+                    home, away = dt.extrair_links_equipes(resp.text)
+                if home and away:
+                    return ("OK", url, home, away)
+                return ("FALLBACK", url)
+            if resp.status_code in STATUS_SESSAO_RECUSADA:
+                return ("FALLBACK", url)
+            if resp.status_code not in STATUS_RETENTAVEIS:
+                return ("ERROR", url, f"HTTP {resp.status_code}")
+            motivo = f"HTTP {resp.status_code}"
+        except httpx.TransportError as e:
+            motivo = f"{type(e).__name__}: {e}"
+        except Exception as e:
+            # qualquer outra falha (redirects, URL inválida, pool de parsing) fica só neste confronto
+            motivo = f"{type(e).__name__}: {e}"
+            log.warning(f"[F2] Erro em {url}: {motivo}")
+            if resp is not None and resp.status_code == 200:
+                return ("FALLBACK", url)    # página obtida, mas não interpretada: tenta o Selenium
+            return ("ERROR", url, motivo)
+        if tentativa + 1 < tentativas:
+            metricas.registo.contar("f2_retentativas")
+            await asyncio.sleep(_tempo_backoff(tentativa, resp))
+    log.warning(f"[F2] {url} falhou após {tentativas} tentativas ({motivo}).")
+    return ("ERROR", url, motivo)
+
+
+async def _resolver_todos(urls, headers, cookies, controlador, pool_conexoes, timeout, tentativas, ao_concluir, parsing):
+    limites = httpx.Limits(max_connections=pool_conexoes,
+                           max_keepalive_connections=pool_conexoes,
+                           keepalive_expiry=30)
+    resultados = {}
+    async with httpx.AsyncClient(http2=True, limits=limites, timeout=timeout, headers=headers,
+                                 cookies=cookies, follow_redirects=True) as client:
+        tarefas = [asyncio.create_task(_resolver_um(client, controlador, url, tentativas, parsing))
+                   for url in urls]
+        for tarefa in asyncio.as_completed(tarefas):
+            res = await tarefa
+            resultados[res[1]] = res
+            if ao_concluir:
+                ao_concluir(res)
+    return resultados
+
+
+def resolver_links_confrontos(urls, headers=None, cookies=None, controlador=None, pool_conexoes=20,
+                              timeout=20, tentativas=TENTATIVAS_HTTP, ao_concluir=None, parsing=None):
+    """
+    Resolve em paralelo (asyncio + HTTP/2, conexões keep-alive) os links das equipas de cada confronto.
+    Quantos pedidos correm ao mesmo tempo é decidido pelo controlador AIMD (por omissão o
+    partilhado, concorrencia.redscore); `pool_conexoes` é só o teto de conexões abertas.
+    Com `parsing` (parsing_paralelo.PoolParsing), o HTML é interpretado fora do event loop.
+    Retorna um dict url -> resultado (ver _resolver_um). `ao_concluir` é chamado a cada resultado.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    return asyncio.run(_resolver_todos(urls, headers, cookies, controlador or concorrencia.redscore,
+                                       pool_conexoes, timeout, tentativas, ao_concluir, parsing))
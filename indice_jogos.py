@@ -0,0 +1,83 @@
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# chave empacotada num inteiro de 64 bits: | dia (ordinal, 20 bits) | casa (22 bits) | fora (22 bits) |
+BITS_EQUIPA = 22
+_MASCARA_EQUIPA = (1 << BITS_EQUIPA) - 1
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _ordinal(data):
+    try:
+        return date.fromisoformat(data).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class IndiceJogos:
+    """
+    Índice compacto das chaves (Data, Home, Away) de 'jogos': cada equipa recebe um id inteiro
+    (nomes internados) e cada chave é empacotada, sem colisões, num uint64 guardado num array
+    NumPy ordenado. Ocupa 8 bytes por jogo em vez de um tuplo de três strings num set.
+    Suporta `chave in indice` (uma linha) e `contem(df)` (vetorizado).
+    """
+
+    def __init__(self):
+        self._ids = {}                                # nome da equipa -> id
+        self._chaves = np.empty(0, dtype=np.uint64)   # sempre ordenado e sem repetidos
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def __contains__(self, chave):
+        data, home, away = chave
+        dia, id_home, id_away = _ordinal(data), self._ids.get(home), self._ids.get(away)
+        if dia is None or id_home is None or id_away is None:
+            return False
+        valor = np.uint64((dia << 2 * BITS_EQUIPA) | (id_home << BITS_EQUIPA) | id_away)
+        pos = np.searchsorted(self._chaves, valor)
+        return bool(pos < len(self._chaves) and self._chaves[pos] == valor)
+
+    def _ids_de(self, nomes, criar):
+        if criar:
+            for nome in pd.unique(nomes.dropna()):
+                if nome not in self._ids:
+                    if len(self._ids) > _MASCARA_EQUIPA:
+                        raise OverflowError("IndiceJogos: demasiadas equipas para a chave de 64 bits.")
+                    self._ids[sys.intern(nome)] = len(self._ids)
+        return nomes.map(self._ids)
+
+    def _empacotar(self, df, criar=False):
+        """uint64 por linha de `df` (colunas Data, Home, Away) e a máscara das linhas válidas."""
+        dias = pd.to_datetime(df["Data"], format="%Y-%m-%d", errors="coerce")
+        partes = pd.DataFrame({
+            "dia": dias.to_numpy("datetime64[D]").astype("int64") + _ORDINAL_EPOCH,
+            "home": self._ids_de(df["Home"], criar),
+            "away": self._ids_de(df["Away"], criar),
+        })
+        validas = (dias.notna() & partes["home"].notna() & partes["away"].notna()).to_numpy()
+        p = partes[validas].astype("uint64")
+        valores = ((p["dia"].to_numpy() << np.uint64(2 * BITS_EQUIPA))
+                   | (p["home"].to_numpy() << np.uint64(BITS_EQUIPA))
+                   | p["away"].to_numpy())
+        return valores, validas
+
+    def adicionar(self, df):
+        """Acrescenta as chaves das linhas de `df` (colunas Data, Home, Away)."""
+        if df.empty:
+            return
+        valores, _ = self._empacotar(df, criar=True)
+        self._chaves = np.union1d(self._chaves, valores)
+
+    def contem(self, df):
+        """Array booleano: para cada linha de `df`, se a chave (Data, Home, Away) já está no índice."""
+        resultado = np.zeros(len(df), dtype=bool)
+        if df.empty or not len(self._chaves):
+            return resultado
+        valores, validas = self._empacotar(df)
+        pos = np.searchsorted(self._chaves, valores).clip(max=len(self._chaves) - 1)
+        resultado[validas] = self._chaves[pos] == valores
+        return resultado
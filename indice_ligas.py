@@ -0,0 +1,61 @@
+import unicodedata
+from functools import lru_cache
+
+import ligas_config as cfg
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos, transforma em lowercase e remove espaços extras."""
+    if not isinstance(texto, str):
+        return ""
+    texto = unicodedata.normalize("NFKD", texto).encode(
+        "ASCII", "ignore").decode("utf-8")
+    return " ".join(texto.lower().split())
+
+
+class IndiceLigas:
+    """
+    Índice das ligas permitidas, construído uma vez:
+      - por nome normalizado, para filtrar os blocos da agenda ("País - Liga");
+      - por alias (o `alt` da imagem da liga na página do time) -> nome canónico.
+    """
+
+    def __init__(self, ligas):
+        # ordem fixa: o alias ambíguo ("Serie A") resolve sempre para a mesma liga
+        self.ligas = sorted(ligas)
+        self._por_normalizado = {normalizar(liga): liga for liga in self.ligas}
+        self._minusculas = [(liga.lower(), liga) for liga in self.ligas]
+        self._aliases = {}
+        for liga in self.ligas:
+            self.liga_do_alias(liga.split(" - ", 1)[-1])
+
+    def permitida(self, nome_liga):
+        """Nome canónico da liga da agenda, ou None se não for permitida."""
+        return self._por_normalizado.get(normalizar(nome_liga))
+
+    def liga_do_alias(self, liga_local):
+        """Liga permitida cujo nome contém `liga_local` (sem diferenciar maiúsculas), ou None."""
+        alias = liga_local.lower()
+        try:
+            return self._aliases[alias]
+        except KeyError:
+            pass
+        liga = next((liga for minusculas, liga in self._minusculas if alias in minusculas), None)
+        self._aliases[alias] = liga
+        return liga
+
+    def liga_da_linha(self, liga_local, liga_principal):
+        """Liga de uma linha da grelha do time: a liga do confronto tem prioridade sobre o alias."""
+        if liga_local.lower() in liga_principal.lower():
+            return liga_principal
+        return self.liga_do_alias(liga_local)
+
+
+@lru_cache(maxsize=8)
+def _indice(ligas):
+    return IndiceLigas(ligas)
+
+
+def indice_para(ligas=cfg.LIGAS_PERMITIDAS):
+    """Índice partilhado para um conjunto de ligas (por omissão, ligas_config.LIGAS_PERMITIDAS)."""
+    return _indice(frozenset(ligas))
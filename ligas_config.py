@@ -80,3 +80,23 @@ LIGAS_PERMITIDAS = {
 }
 
 LIMITE_JOGOS_POR_TIME = 50
+
+# peso de cada liga na ordem das visitas da fase 3 (agendador.py); as restantes valem PRIORIDADE_LIGA_PADRAO
+PRIORIDADE_LIGA_PADRAO = 1
+PRIORIDADE_LIGAS = {
+    "Alemanha - Bundesliga": 3,
+    "Brasil - Serie A": 3,
+    "Espanha - La Liga": 3,
+    "França - Ligue 1": 3,
+    "Inglaterra - Premier League": 3,
+    "Itália - Serie A": 3,
+    "Portugal - Primeira Liga": 3,
+    "Alemanha - 2. Bundesliga": 2,
+    "Argentina - Superliga": 2,
+    "Brasil - Serie B": 2,
+    "Espanha - La Liga 2": 2,
+    "Inglaterra - Championship": 2,
+    "Itália - Serie B": 2,
+    "Países Baixos - Eredivisie": 2,
+    "Turquia - Super Lig": 2,
+}
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+LIMITES_HISTOGRAMA_S = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60)
+# ================================
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+class Metricas:
+    """
+    Métricas de uma execução, partilhadas entre threads:
+      - fases: duração de cada fase da rotina;
+      - tempos: tempo acumulado por componente (rede, selenium, parsing, db);
+      - histogramas: latências individuais (ex.: cada pedido HTTP da fase 2/3);
+      - contadores: fallbacks, retentativas, erros, ...;
+      - equipas: linhas lidas na grelha vs linhas novas, por equipa.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.inicio = datetime.now()
+            self.fases, self.tempos, self.contadores = {}, {}, {}
+            self.latencias, self.equipas = {}, {}
+
+    def contar(self, nome, n=1):
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + n
+
+    def observar(self, nome, segundos):
+        with self._lock:
+            self.latencias.setdefault(nome, []).append(segundos)
+
+    def acumular(self, componente, segundos):
+        with self._lock:
+            self.tempos[componente] = self.tempos.get(componente, 0.0) + segundos
+
+    def equipa(self, url, lidas, novas):
+        with self._lock:
+            self.equipas[url] = {"lidas": lidas, "novas": novas}
+
+    @contextmanager
+    def cronometro(self, componente, histograma=None):
+        """
+        Soma a duração do bloco em `componente` e, opcionalmente, regista-a num histograma.
+        Também serve de decorador (mede cada chamada da função).
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - t0
+            self.acumular(componente, duracao)
+            if histograma:
+                self.observar(histograma, duracao)
+
+    def fase(self, nome, segundos):
+        with self._lock:
+            self.fases[nome] = self.fases.get(nome, 0.0) + segundos
+
+    def _histogramas(self):
+        resultado = {}
+        for nome, valores in self.latencias.items():
+            ordenados = sorted(valores)
+            resultado[nome] = {
+                "contagem": len(ordenados),
+                "soma_s": round(sum(ordenados), 4),
+                "p50_s": _percentil(ordenados, 0.50),
+                "p95_s": _percentil(ordenados, 0.95),
+                "max_s": ordenados[-1],
+                # acumulados, como no Prometheus (le = "menor ou igual a")
+                "buckets": {str(limite): sum(1 for v in ordenados if v <= limite)
+                            for limite in LIMITES_HISTOGRAMA_S},
+            }
+        return resultado
+
+    def relatorio(self, config=None):
+        with self._lock:
+            return {
+                "inicio": self.inicio.strftime("%Y-%m-%d %H:%M:%S"),
+                "fim": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "config": config or {},
+                "fases_s": {k: round(v, 3) for k, v in self.fases.items()},
+                "tempos_s": {k: round(v, 3) for k, v in self.tempos.items()},
+                "contadores": dict(self.contadores),
+                "histogramas": self._histogramas(),
+                "equipas": dict(self.equipas),
+            }
+
+    def gravar_json(self, caminho, config=None):
+        relatorio = self.relatorio(config)
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        log.info(f"[METRICAS] Relatório da execução gravado em {caminho}.")
+        return relatorio
+
+    def gravar_prometheus(self, caminho):
+        """Textfile para o node_exporter (textfile collector); escrita atómica."""
+        with self._lock:
+            linhas = []
+            for nome, v in self.fases.items():
+                linhas.append(f'redscore_fase_segundos{{fase="{nome}"}} {v:.3f}')
+            for nome, v in self.tempos.items():
+                linhas.append(f'redscore_componente_segundos{{componente="{nome}"}} {v:.3f}')
+            for nome, v in self.contadores.items():
+                linhas.append(f'redscore_eventos_total{{evento="{nome}"}} {v}')
+            for nome, h in self._histogramas().items():
+                for limite, n in h["buckets"].items():
+                    linhas.append(f'redscore_latencia_segundos_bucket{{pedido="{nome}",le="{limite}"}} {n}')
+                linhas.append(f'redscore_latencia_segundos_bucket{{pedido="{nome}",le="+Inf"}} {h["contagem"]}')
+                linhas.append(f'redscore_latencia_segundos_sum{{pedido="{nome}"}} {h["soma_s"]}')
+                linhas.append(f'redscore_latencia_segundos_count{{pedido="{nome}"}} {h["contagem"]}')
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write("\n".join(linhas) + "\n")
+        os.replace(temporario, caminho)
+
+
+# instância partilhada pelo coletor e pelos scrapers
+registo = Metricas()
@@ -0,0 +1,90 @@
+"""
+Construção do driver Selenium com um perfil leve para raspagem.
+
+Os scrapers só leem `driver.page_source` depois de um seletor CSS estar presente; o resto da
+página (imagens, fontes, vídeos, anúncios, trackers) só custa tempo de render e RAM do browser.
+Este módulo junta num só sítio:
+  - opções do Chrome (headless, sem extensões/GPU/áudio, imagens desligadas no perfil);
+  - page load strategy `eager` (ou `none`): driver.get volta no DOMContentLoaded e a espera
+    fica a cargo dos WebDriverWait que já existem nos scrapers;
+  - bloqueio de pedidos por padrão de URL via CDP (Network.setBlockedURLs).
+
+`criar_driver()` é o ponto de entrada para quem cria o browser (o login_redscore);
+`aplicar_bloqueios(driver)` também serve para um driver criado noutro sítio.
+"""
+import logging
+
+from selenium import webdriver
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+HEADLESS = True
+ESTRATEGIA_CARREGAMENTO = "eager"      # "normal" | "eager" | "none"
+TIMEOUT_CARREGAMENTO_S = 30
+BLOQUEAR_IMAGENS = True
+BLOQUEAR_FONTES = True
+BLOQUEAR_MEDIA = True
+# anúncios/trackers vistos nas páginas do RedScore (padrões do Network.setBlockedURLs)
+DOMINIOS_BLOQUEADOS = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*googletagservices.com*", "*adservice.google.*",
+    "*facebook.net*", "*hotjar.com*", "*criteo.*", "*taboola.com*", "*outbrain.com*",
+    "*amazon-adsystem.com*", "*adnxs.com*", "*scorecardresearch.com*", "*quantserve.com*",
+]
+# ================================
+
+EXTENSOES_IMAGENS = ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.avif*"]
+EXTENSOES_FONTES = ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"]
+EXTENSOES_MEDIA = ["*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*"]
+
+
+def padroes_bloqueados(imagens=BLOQUEAR_IMAGENS, fontes=BLOQUEAR_FONTES, media=BLOQUEAR_MEDIA,
+                       dominios=DOMINIOS_BLOQUEADOS):
+    padroes = list(dominios)
+    if imagens:
+        padroes += EXTENSOES_IMAGENS
+    if fontes:
+        padroes += EXTENSOES_FONTES
+    if media:
+        padroes += EXTENSOES_MEDIA
+    return padroes
+
+
+def opcoes_chrome(headless=HEADLESS, estrategia=ESTRATEGIA_CARREGAMENTO, imagens=BLOQUEAR_IMAGENS):
+    """ChromeOptions do perfil de raspagem."""
+    opcoes = webdriver.ChromeOptions()
+    opcoes.page_load_strategy = estrategia
+    if headless:
+        opcoes.add_argument("--headless=new")
+    for argumento in ("--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage", "--disable-extensions",
+                      "--disable-notifications", "--mute-audio", "--no-first-run",
+                      "--disable-background-networking", "--disable-component-update",
+                      "--window-size=1366,900"):
+        opcoes.add_argument(argumento)
+    if imagens:
+        opcoes.add_argument("--blink-settings=imagesEnabled=false")
+        opcoes.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2})
+    return opcoes
+
+
+def aplicar_bloqueios(driver, padroes=None):
+    """Bloqueia (CDP) os pedidos cujos URLs casam com os padrões; ignora browsers sem CDP."""
+    padroes = padroes_bloqueados() if padroes is None else padroes
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+        log.info(f"[NAVEGADOR] {len(padroes)} padrões de URL bloqueados.")
+    except Exception as e:
+        log.warning(f"[NAVEGADOR] Bloqueio de recursos indisponível neste driver: {e}")
+    return driver
+
+
+def criar_driver(headless=HEADLESS, estrategia=ESTRATEGIA_CARREGAMENTO):
+    """Chrome com o perfil leve, bloqueios aplicados e timeout de carregamento."""
+    driver = webdriver.Chrome(options=opcoes_chrome(headless, estrategia))
+    driver.set_page_load_timeout(TIMEOUT_CARREGAMENTO_S)
+    return aplicar_bloqueios(driver)
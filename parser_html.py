@@ -0,0 +1,38 @@
+import logging
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+log = logging.getLogger(__name__)
+
+# ================================
+# Backend de parsing
+# ================================
+# lxml é várias vezes mais rápido que o html.parser; se não estiver instalado, mantém-se o do bs4
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+    log.info("lxml não instalado; a usar o html.parser do BeautifulSoup.")
+
+
+def _com_classe(*classes):
+    """
+    Regex para o atributo class no SoupStrainer: durante o parsing o valor ainda vem como
+    string única ("a b c"), por isso a comparação direta falharia com mais de uma classe.
+    """
+    return re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(map(re.escape, classes)))
+
+
+# ================================
+# Recortes por página: só estes contentores (e descendentes) são construídos na árvore
+# ================================
+SO_LIGAS_AGENDA = SoupStrainer("div", id=re.compile(r"^league_"))
+SO_EQUIPAS_CONFRONTO = SoupStrainer(
+    "div", class_=_com_classe("match-detail__teams", "match-detail__name", "match-detail__team"))
+SO_GRELHA_TIME = SoupStrainer("div", class_=_com_classe("match-grid__bottom"))
+
+
+def sopa(html, apenas=None):
+    """BeautifulSoup com o backend mais rápido disponível; `apenas` limita a árvore a um recorte."""
+    return BeautifulSoup(html, PARSER, parse_only=apenas)
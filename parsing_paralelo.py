@@ -0,0 +1,132 @@
+"""
+Pipeline busca/parsing: quem busca (workers HTTP e driver da fase 3, event loop da fase 2) só
+obtém o HTML; o parsing (BeautifulSoup/lxml, CPU e com o GIL) corre num pool de processos.
+Assim as esperas de rede e o parsing sobrepõem-se e usam todos os núcleos.
+
+  - os processos só importam processo_parsing (sem o arranque do coletor);
+  - o que é igual para todas as páginas (chaves já gravadas, ligas permitidas) vai para cada
+    processo uma só vez, no arranque; por página só viajam o HTML e a URL;
+  - as páginas em voo são limitadas (PAGINAS_EM_ESPERA): se os parsers se atrasam, quem busca
+    espera, e a memória não cresce com o número de equipas;
+  - métricas, auditoria e log do parsing são registados no processo principal, quando o
+    resultado chega (ver data.registar_grelha_time).
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import data as dt
+import ligas_config as cfg
+import metricas
+import processo_parsing
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+PROCESSOS_PARSING = (os.cpu_count() or 1) - 1   # um núcleo fica para quem busca; 0 = parsing na própria thread
+PAGINAS_EM_ESPERA = 32             # páginas buscadas à espera de parsing antes de quem busca parar
+# ================================
+
+def _contexto_multiprocessing():
+    # forkserver: processos limpos (o coletor já tem threads a correr) e, com processo_parsing
+    # pré-carregado, um segundo pool arranca sem voltar a importar pandas/bs4
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context("forkserver")
+        contexto.set_forkserver_preload([processo_parsing.__name__])
+        return contexto
+    return multiprocessing.get_context("spawn")
+
+
+class PoolParsing:
+    """Pool de processos de parsing de uma fase (usar com `with`, ou chamar fechar())."""
+
+    def __init__(self, jogos_existentes=frozenset(), ligas_permitidas_set=cfg.LIGAS_PERMITIDAS,
+                 processos=PROCESSOS_PARSING, em_espera=PAGINAS_EM_ESPERA):
+        self._contexto = {"jogos_existentes": jogos_existentes, "ligas_permitidas": ligas_permitidas_set}
+        self.em_espera = em_espera
+        self._vagas = threading.BoundedSemaphore(em_espera)
+        self._erro = None       # 1ª falha de um ao_concluir (gravação): sobe em esperar()/fechar()
+        self._pool = None
+        if processos > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=processos, mp_context=_contexto_multiprocessing(),
+                initializer=processo_parsing.iniciar, initargs=(jogos_existentes, ligas_permitidas_set))
+
+    def jogos_time(self, html, time_url, liga_principal, ultima_data=None, ao_concluir=None):
+        """
+        Extrai a grelha da página do time e chama `ao_concluir(jogos)` (None se a grelha não
+        estiver no HTML) numa thread do pool. Bloqueia enquanto houver PAGINAS_EM_ESPERA em voo.
+        Uma exceção de `ao_concluir` não é um erro de parsing: depois dela não são aceites mais
+        páginas e esperar()/fechar() levantam-na.
+        """
+        def concluir(grelha, segundos):
+            metricas.registo.acumular("parsing", segundos)
+            ao_concluir(dt.registar_grelha_time(time_url, grelha))
+
+        if self._pool is None:
+            concluir(*processo_parsing.grelha_time(html, liga_principal, ultima_data, self._contexto))
+            return
+        self._verificar()
+        self._vagas.acquire()
+        try:
+            futuro = self._pool.submit(processo_parsing.grelha_time, html, liga_principal, ultima_data)
+        except Exception:
+            self._vagas.release()
+            raise
+
+        def resultado(futuro):
+            try:
+                try:
+                    grelha = futuro.result()
+                except Exception as e:
+                    log.error(f"[PARSING] Falha no parsing de {time_url}: {e}")
+                    metricas.registo.contar("parsing_erros")
+                    return
+                concluir(*grelha)
+            except Exception as e:
+                log.error(f"[PARSING] Falha ao entregar {time_url}: {e}")
+                self._erro = self._erro or e
+            finally:
+                self._vagas.release()
+
+        futuro.add_done_callback(resultado)
+
+    async def links_confronto(self, html):
+        """(home_link, away_link) do HTML de um confronto, sem ocupar o event loop."""
+        if self._pool is None:
+            return dt.extrair_links_equipes(html)
+        links, segundos = await asyncio.wrap_future(self._pool.submit(processo_parsing.links_confronto, html))
+        metricas.registo.acumular("parsing", segundos)
+        return links
+
+    def _verificar(self):
+        if self._erro:
+            raise RuntimeError(f"Entrega de resultados interrompida: {self._erro}") from self._erro
+
+    def esperar(self):
+        """Espera que todas as páginas entregues a jogos_time tenham sido tratadas."""
+        for _ in range(self.em_espera):
+            self._vagas.acquire()
+        for _ in range(self.em_espera):
+            self._vagas.release()
+        self._verificar()
+
+    def fechar(self):
+        if self._pool is not None:
+            try:
+                self.esperar()
+            finally:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
@@ -0,0 +1,30 @@
+"""
+O que corre dentro dos processos do pool de parsing (parsing_paralelo.PoolParsing).
+
+É o módulo pré-carregado pelo forkserver e o único que os processos precisam de importar:
+só traz o parsing de data.py, sem o arranque do coletor (logging, login, credenciais).
+"""
+import time
+
+import data as dt
+
+# o que foi recebido no arranque do processo
+_contexto = {}
+
+
+def iniciar(jogos_existentes, ligas_permitidas_set):
+    _contexto["jogos_existentes"] = jogos_existentes
+    _contexto["ligas_permitidas"] = ligas_permitidas_set
+
+
+def grelha_time(html, liga_principal, ultima_data, contexto=None):
+    contexto = contexto or _contexto
+    t0 = time.perf_counter()
+    grelha = dt.extrair_grelha_time(
+        html, liga_principal, contexto["jogos_existentes"], contexto["ligas_permitidas"], ultima_data)
+    return grelha, time.perf_counter() - t0
+
+
+def links_confronto(html):
+    t0 = time.perf_counter()
+    return dt.extrair_links_equipes(html), time.perf_counter() - t0
@@ -0,0 +1,135 @@
+"""
+Reprocessamento offline do arquivo de páginas (arquivo_paginas.py): sem rede nem browser.
+
+Depois de uma mudança de layout ou de uma correção em extrair_grelha_time/extrair_jogos_agenda,
+reconstrói as linhas a partir das páginas arquivadas. O parsing corre num pool de processos
+(um por núcleo); o processo principal só grava:
+  - páginas de time  -> 'jogos' (UPSERT; a captura mais recente prevalece);
+  - páginas da agenda -> 'agenda' (as odds corrigidas entram em odds_historico com a hora do
+    reprocessamento, não a da captura).
+As páginas de confronto ficam no arquivo, mas não geram linhas.
+
+    python reparse.py --desde 2026-01-01 --ate 2026-03-31
+    python reparse.py --tipos time --processos 4
+"""
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import agenda
+import arquivo_paginas
+import banco
+import consultas
+import data as dt
+import exportacao
+import historico_odds
+import ligas_config as cfg
+
+log = logging.getLogger(__name__)
+
+# ================================
+# CONFIGURÁVEL
+# ================================
+LINHAS_POR_LOTE = 20000            # linhas de 'jogos' acumuladas antes de cada UPSERT
+PAGINAS_POR_TAREFA = 8             # páginas enviadas de cada vez a um processo
+# ================================
+
+TIPOS_REPROCESSAVEIS = ("agenda", "time")
+
+
+def _parsear(tarefa):
+    """
+    Corre num processo do pool: lê e descomprime o objeto e extrai as linhas. Sem auditoria:
+    os CSVs do dia são da raspagem, e o que um processo do pool deixasse em buffer perdia-se.
+    """
+    tipo, caminho, url, contexto = tarefa
+    try:
+        html = arquivo_paginas.ler_objeto(caminho)
+        if tipo == "agenda":
+            return dt.extrair_jogos_agenda(html, cfg.LIGAS_PERMITIDAS, contexto, snapshot=None, auditar=False)
+        grelha = dt.extrair_grelha_time(html, contexto, set(), cfg.LIGAS_PERMITIDAS)
+        return grelha[0] if grelha else []
+    except Exception as e:
+        log.warning(f"[REPARSE] Falha ao reprocessar {caminho} ({url}): {e}")
+        return []
+
+
+def reprocessar(conn, desde=None, ate=None, tipos=TIPOS_REPROCESSAVEIS, processos=None,
+                arquivo=arquivo_paginas.arquivo):
+    """
+    Reprocessa as capturas entre `desde` e `ate` (datas de captura, "YYYY-MM-DD").
+    Objetos repetidos com o mesmo contexto são lidos uma só vez (fica a última captura).
+    Retorna {"paginas", "agenda", "raspados", "inseridos", "atualizados"}.
+    """
+    unicas = {}
+    for _, tipo, url, contexto, objeto in arquivo.capturas(desde, ate, tipos):
+        unicas.pop((tipo, objeto, contexto), None)
+        unicas[(tipo, objeto, contexto)] = url
+    tarefas = [(tipo, arquivo.caminho(objeto), url, contexto)
+               for (tipo, objeto, contexto), url in unicas.items()]
+    totais = dict.fromkeys(["paginas", "agenda", "raspados", "inseridos", "atualizados"], 0)
+    totais["paginas"] = len(tarefas)
+    log.info(f"[REPARSE] {len(tarefas)} páginas a reprocessar ({desde or 'início'} a {ate or 'hoje'}).")
+
+    lote, descartados = [], []
+
+    def gravar_lote():
+        df = dt.processar_dados_raspados(lote, descartados)
+        if not df.empty:
+            df = df.drop_duplicates(subset=banco.CHAVE_JOGOS, keep="last")
+            inseridos, atualizados = banco.upsert_jogos(conn, df)
+            totais["inseridos"] += inseridos
+            totais["atualizados"] += atualizados
+        lote.clear()
+
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count()) as pool:
+        # map mantém a ordem das capturas: num conflito, a página mais recente é gravada por último
+        resultados = pool.map(_parsear, tarefas, chunksize=PAGINAS_POR_TAREFA)
+        for (tipo, _, _, contexto), linhas in zip(tarefas, resultados):
+            if tipo == "agenda":
+                totais["agenda"] += agenda.gravar_agenda(conn, linhas, contexto)
+                continue
+            totais["raspados"] += len(linhas)
+            lote.extend(linhas)
+            if len(lote) >= LINHAS_POR_LOTE:
+                gravar_lote()
+    gravar_lote()
+    if descartados:
+        dt.gravar_jogos_descartados(descartados)
+    log.info(f"[REPARSE] Concluído: {totais}")
+    return totais
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocessa as páginas arquivadas sem rede nem browser")
+    parser.add_argument("--desde", help="primeira data de captura (YYYY-MM-DD)")
+    parser.add_argument("--ate", help="última data de captura (YYYY-MM-DD)")
+    parser.add_argument("--tipos", nargs="+", choices=TIPOS_REPROCESSAVEIS, default=list(TIPOS_REPROCESSAVEIS))
+    parser.add_argument("--processos", type=int, help="processos de parsing (por omissão, um por núcleo)")
+    parser.add_argument("--db", default="dados.db")
+    parser.add_argument("--csv", default="dados_redscore.csv", help="CSV exportado no fim ('' para não exportar)")
+    args = parser.parse_args(argv)
+
+    conn = banco.conectar(args.db)
+    try:
+        banco.inicializar_banco(conn)
+        consultas.inicializar_consultas(conn)
+        agenda.inicializar_agenda(conn)
+        historico_odds.inicializar_historico_odds(conn)
+        exportacao.inicializar_exportacoes(conn)
+        totais = reprocessar(conn, args.desde, args.ate, args.tipos, args.processos)
+        if args.csv:
+            # linhas já exportadas podem ter mudado: nesse caso o CSV é reescrito
+            exportacao.exportar_csv(conn, args.csv, completo=totais["atualizados"] > 0)
+        print(f"{totais['paginas']} páginas reprocessadas: {totais['inseridos']} jogos novos, "
+              f"{totais['atualizados']} atualizados, {totais['agenda']} jogos de agenda.")
+    finally:
+        conn.close()
+        arquivo_paginas.arquivo.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
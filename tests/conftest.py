@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def pasta_temporaria(tmp_path, monkeypatch):
+    # os módulos escrevem CSVs, logs e bancos relativos à pasta atual
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def jogo_raspado():
+    """Fábrica de jogos como saem da grelha de um time (antes de processar_dados_raspados)."""
+    def criar(home="Casa", away="Fora", data="2026-10-01"):
+        return {"Liga": "Serie A", "Data": data, "Home": home, "Away": away,
+                "Placar_FT": "2 - 1", "Placar_HT": "1 - 0", "Chutes": "12 - 7", "Chutes_Gol": "5 - 2",
+                "Ataques": "60 - 41", "Escanteios": "6 - 3",
+                "Odd_H_str": "1.85", "Odd_D_str": "3.40", "Odd_A_str": "4.20"}
+    return criar
@@ -0,0 +1,86 @@
+import banco
+import checkpoint
+import gravacao
+
+DB = "dados.db"
+EQUIPAS = {f"https://redscores.com/time/{i}": "Serie A" for i in range(4)}
+AGENDA = [{"data": "2026-10-18", "hora": "15:00", "home": "Casa", "away": "Fora"}]
+
+
+def _banco():
+    conn = banco.conectar(DB)
+    banco.inicializar_banco(conn)
+    return conn
+
+
+def _gravar(ck, urls, jogo_raspado):
+    grav = gravacao.GravacaoContinua(DB, ck, linhas_por_lote=1)
+    for url in urls:
+        grav.receber(url, [jogo_raspado(away=f"Fora {url}")], "2026-10-01")
+    return grav.finalizar()
+
+
+def _execucao_interrompida_na_fase3(dia, jogo_raspado):
+    """Fases 1 e 2 concluídas e só metade das equipas gravadas antes da queda."""
+    ck = checkpoint.Checkpoint(DB, dia)
+    assert ck.iniciar() == 0
+    ck.gravar_agenda(AGENDA)
+    ck.gravar_equipas(EQUIPAS)
+    _gravar(ck, list(EQUIPAS)[:2], jogo_raspado)
+    ck.fechar()
+
+
+def _contar_jogos():
+    conn = banco.conectar(DB)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM jogos").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_retomar_continua_so_com_as_equipas_pendentes(jogo_raspado):
+    _banco().close()
+    _execucao_interrompida_na_fase3("2026-10-18", jogo_raspado)
+
+    ck = checkpoint.Checkpoint(DB, "2026-10-18")
+    assert ck.iniciar(retomar=True) == checkpoint.FASE_LINKS
+    assert ck.carregar_agenda() == AGENDA
+    assert ck.carregar_equipas() == EQUIPAS
+    pendentes = ck.carregar_equipas(so_pendentes=True)
+    assert list(pendentes) == list(EQUIPAS)[2:]
+
+    _gravar(ck, pendentes, jogo_raspado)
+    assert ck.carregar_equipas(so_pendentes=True) == {}
+    ck.finalizar()
+    assert ck.iniciar(retomar=True) == checkpoint.FASE_GRAVACAO
+    ck.fechar()
+    assert _contar_jogos() == len(EQUIPAS)
+
+
+def test_retomar_depois_da_meia_noite_usa_o_dia_da_execucao_interrompida(jogo_raspado):
+    _banco().close()
+    _execucao_interrompida_na_fase3("2026-10-18", jogo_raspado)
+
+    # o coletor recalcula o dia da agenda ao arrancar: depois da meia-noite já é outro
+    ck = checkpoint.Checkpoint(DB, "2026-10-19")
+    assert ck.iniciar(retomar=True) == checkpoint.FASE_LINKS
+    assert ck.dia == "2026-10-18"
+    assert ck.carregar_agenda() == AGENDA
+    assert list(ck.carregar_equipas(so_pendentes=True)) == list(EQUIPAS)[2:]
+    ck.fechar()
+
+
+def test_sem_retomar_o_progresso_anterior_e_descartado(jogo_raspado):
+    _banco().close()
+    _execucao_interrompida_na_fase3("2026-10-18", jogo_raspado)
+
+    ck = checkpoint.Checkpoint(DB, "2026-10-19")
+    assert ck.iniciar() == 0
+    assert ck.dia == "2026-10-19"
+    ck.fechar()
+
+    ck = checkpoint.Checkpoint(DB, "2026-10-19")
+    assert ck.iniciar(retomar=True) == 0
+    assert ck.carregar_equipas() == {}
+    ck.fechar()
+
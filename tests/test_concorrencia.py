@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import concorrencia
+from concorrencia import ControladorAIMD, Resultado
+
+
+def _resultado(status=200, erro=False):
+    resultado = Resultado()
+    resultado.status, resultado.erro = status, erro
+    return resultado
+
+
+def _pedido(controlador, latencia=0.1, **resultado):
+    controlador.adquirir()
+    controlador.libertar(latencia, _resultado(**resultado))
+
+
+@pytest.fixture
+def controlador():
+    return ControladorAIMD(inicial=4, minimo=1, maximo=6, latencia_alvo_s=2.0, intervalo_min_s=0)
+
+
+def test_aumento_aditivo_soma_um_por_janela_ate_ao_maximo(controlador):
+    _pedido(controlador)
+    assert controlador.limite == pytest.approx(4.25)
+
+    # ~limite respostas boas seguidas sobem o limite em ~1
+    controlador.limite = 4.0
+    for _ in range(4):
+        _pedido(controlador)
+    assert 4.9 < controlador.limite < 5.0
+
+    for _ in range(100):
+        _pedido(controlador)
+    assert controlador.limite == 6
+    assert controlador.recuos == 0
+
+
+@pytest.mark.parametrize("sinal", [{"status": 429}, {"status": 503}, {"erro": True}, {"latencia": 5.0}])
+def test_congestionamento_reduz_o_limite_e_alarga_o_intervalo(controlador, sinal):
+    _pedido(controlador, **sinal)
+    assert controlador.limite == 4 * concorrencia.FATOR_RECUO
+    assert controlador.intervalo == concorrencia.INTERVALO_RECUO_S
+    assert controlador.recuos == 1
+    assert controlador.em_curso == 0
+
+
+def test_rajada_de_erros_conta_um_so_recuo(controlador):
+    controlador.adquirir()
+    controlador.adquirir()
+    controlador.libertar(0.1, _resultado(status=429))
+    controlador.libertar(0.1, _resultado(status=429))
+    assert controlador.limite == 2
+    assert controlador.recuos == 1
+
+
+def test_recuos_param_no_minimo(controlador, monkeypatch):
+    monkeypatch.setattr(concorrencia, "JANELA_RECUO_S", 0)
+    monkeypatch.setattr(concorrencia, "INTERVALO_RECUO_S", 0)
+    for _ in range(10):
+        _pedido(controlador, status=429)
+    assert controlador.limite == 1
+    assert controlador.recuos == 10
+
+
+def test_erro_4xx_nao_aumenta_nem_recua(controlador):
+    _pedido(controlador, status=404)
+    assert controlador.limite == 4
+    assert controlador.recuos == 0
+
+
+def test_pedido_conta_excecao_como_erro_e_liberta_o_slot(controlador):
+    with pytest.raises(TimeoutError):
+        with controlador.pedido():
+            assert controlador.em_curso == 1
+            raise TimeoutError
+    assert controlador.em_curso == 0
+    assert controlador.limite == 2
+
+
+def test_pedido_async_partilha_o_mesmo_orcamento(controlador):
+    async def pedir():
+        async with controlador.pedido_async() as resultado:
+            resultado.status = 200
+
+    asyncio.run(pedir())
+    assert controlador.limite == pytest.approx(4.25)
+    assert controlador.em_curso == 0
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import banco
+import consultas
+import data as dt
+
+
+@pytest.fixture
+def conn(jogo_raspado):
+    conn = banco.conectar("dados.db")
+    banco.inicializar_banco(conn)
+    consultas.inicializar_consultas(conn)
+    banco.upsert_jogos(conn, dt.processar_dados_raspados([
+        jogo_raspado("KFUM", "Molde", "2025-08-01"),
+        jogo_raspado("Brann", "HamKam", "2025-08-10"),
+        jogo_raspado("KFUM", "Brann", "2025-08-30"),       # depois do jogo do dia: não conta
+    ]))
+    yield conn
+    conn.close()
+
+
+def _csv(tmp_path, cabecalho, linhas):
+    caminho = tmp_path / "Jogos_do_Dia_RedScore_2025-08-22.csv"
+    caminho.write_text("\n".join([cabecalho, *linhas]) + "\n", encoding="utf-8")
+    return pd.read_csv(caminho)
+
+
+def test_features_de_csv_sem_coluna_data(conn, tmp_path):
+    jogos = _csv(tmp_path, "id_jogo,liga,hora,home,away,link_confronto,odd_h,odd_d,odd_a",
+                 ["19354701,Noruega - Eliteserien,14:00,KFUM,HamKam,https://redscores.com/x,0,77,1.65"])
+
+    features = consultas.features_jogos_do_dia(conn, jogos, data="2025-08-22")
+
+    assert features[["data", "liga", "home", "away"]].values.tolist() == [
+        ["2025-08-22", "Noruega - Eliteserien", "KFUM", "HamKam"]]
+    assert features.loc[0, "Home_Jogos"] == 1
+    assert features.loc[0, "Home_Gols_Pro"] == 2
+    assert features.loc[0, "Away_Jogos"] == 1
+    assert features.loc[0, "Away_Gols_Pro"] == 1
+
+
+def test_features_sem_data_em_lado_nenhum_explica_o_que_falta(conn, tmp_path):
+    jogos = _csv(tmp_path, "liga,hora,home,away,link_confronto",
+                 ["Noruega - Eliteserien,14:00,KFUM,HamKam,https://redscores.com/x"])
+    with pytest.raises(ValueError, match="data"):
+        consultas.features_jogos_do_dia(conn, jogos)
+
+
+def test_features_da_agenda_raspada_usa_a_data_de_cada_jogo(conn):
+    jogos = [{"data": "2025-08-05", "liga": "Noruega - Eliteserien", "hora": "14:00",
+              "home": "KFUM", "away": "HamKam", "link_confronto": "https://redscores.com/x"}]
+    features = consultas.features_jogos_do_dia(conn, jogos)
+    assert features.loc[0, "data"] == "2025-08-05"
+    assert features.loc[0, "Home_Jogos"] == 1
+    assert features.loc[0, "Away_Jogos"] == 0
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+import data as dt
+
+DATAS_MISTURADAS = [
+    "25/08/2025",       # dia primeiro: não pode impor o formato às linhas seguintes
+    "01/02/2025",
+    "2025-08-22",
+    "12/31/2024",
+    "2025-08-22",
+    "22.08.2025",
+    "Aug 3, 2025",
+    "",
+    "adiado",
+    None,
+    3,
+    "31/02/2025",
+]
+
+
+@pytest.mark.parametrize("ordem", [1, -1])
+def test_formatar_datas_igual_a_formatar_data_linha_a_linha(ordem):
+    textos = DATAS_MISTURADAS[::ordem]
+    vetorizadas = dt._formatar_datas(pd.Series(textos, dtype="object"))
+    for texto, obtida in zip(textos, vetorizadas):
+        esperada = dt._formatar_data(texto)
+        assert (None if pd.isna(obtida) else obtida) == esperada, texto
+
+
+def test_processar_dados_raspados_mantem_a_data_de_cada_linha(jogo_raspado):
+    jogos = [jogo_raspado(away=f"Fora {i}", data=texto)
+             for i, texto in enumerate(["25/08/2025", "01/02/2025", "2025-08-22"])]
+    df = dt.processar_dados_raspados(jogos)
+    assert df["Data"].tolist() == [dt._formatar_data(j["Data"]) for j in jogos]
+    assert df["Data"].tolist()[1] == "2025-01-02"
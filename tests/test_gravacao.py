@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import banco
+import checkpoint
+import gravacao
+
+DB = "dados.db"
+
+
+def _banco():
+    conn = banco.conectar(DB)
+    banco.inicializar_banco(conn)
+    return conn
+
+
+def test_grava_em_lotes_e_descarta_chaves_repetidas(jogo_raspado):
+    _banco().close()
+    grav = gravacao.GravacaoContinua(DB, linhas_por_lote=2)
+    grav.receber("a", [jogo_raspado(away="X"), jogo_raspado(away="Y")], "2026-10-01")
+    grav.receber("b", [jogo_raspado(away="X"), jogo_raspado(away="Z")], "2026-10-01")
+    grav.receber("c", [], None)
+    assert grav.finalizar() == (4, 3, 0)
+
+    conn = banco.conectar(DB)
+    assert conn.execute("SELECT COUNT(*) FROM jogos").fetchone()[0] == 3
+    assert banco.carregar_marcas_equipas(conn, ["a", "b", "c"]) == {"a": "2026-10-01", "b": "2026-10-01"}
+    conn.close()
+
+
+def test_falha_do_escritor_chega_a_finalizar(jogo_raspado):
+    # sem inicializar_banco o UPSERT falha dentro da thread de escrita
+    ck = checkpoint.Checkpoint(DB, "2026-10-18")
+    ck.iniciar()
+    ck.gravar_equipas({"a": "Serie A"})
+    grav = gravacao.GravacaoContinua(DB, ck, linhas_por_lote=1)
+    grav.receber("a", [jogo_raspado()], "2026-10-01")
+    with pytest.raises(RuntimeError, match="no such table"):
+        grav.finalizar()
+    # o lote não chegou ao banco: a equipa continua por concluir
+    assert ck.carregar_equipas(so_pendentes=True) == {"a": "Serie A"}
+    ck.fechar()
+
+
+def test_receber_depois_da_falha_levanta_o_erro(jogo_raspado):
+    grav = gravacao.GravacaoContinua(DB, linhas_por_lote=1)
+    grav.receber("a", [jogo_raspado()], None)
+    grav._thread.join(timeout=5)
+    with pytest.raises(RuntimeError, match="no such table"):
+        grav.receber("b", [jogo_raspado()], None)
+    with pytest.raises(RuntimeError):
+        grav.finalizar()
+
+
+def test_fila_cheia_com_o_escritor_parado_nao_bloqueia(monkeypatch, jogo_raspado):
+    monkeypatch.setattr(gravacao, "EQUIPAS_EM_ESPERA", 2)
+    monkeypatch.setattr(gravacao, "ESPERA_FILA_S", 0.05)
+
+    def processar_e_falhar(jogos, descartados=None):
+        time.sleep(0.2)     # os workers enchem a fila enquanto o escritor está ocupado
+        raise ValueError("falha no processamento")
+
+    monkeypatch.setattr(gravacao.dt, "processar_dados_raspados", processar_e_falhar)
+    grav = gravacao.GravacaoContinua(DB)
+    erros = []
+
+    def worker(n):
+        try:
+            for i in range(20):
+                grav.receber(f"{n}-{i}", [jogo_raspado()], None)
+        except RuntimeError as e:
+            erros.append(e)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=5)
+    assert not any(w.is_alive() for w in workers)
+    assert len(erros) == 4
+
+    def finalizar():
+        try:
+            grav.finalizar()
+        except RuntimeError as e:
+            erros.append(e)
+
+    fim = threading.Thread(target=finalizar)
+    fim.start()
+    fim.join(timeout=5)
+    assert not fim.is_alive()
+    assert len(erros) == 5
@@ -0,0 +1,78 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indice_jogos
+from indice_jogos import BITS_EQUIPA, IndiceJogos
+
+
+def _df(linhas):
+    return pd.DataFrame(linhas, columns=["Data", "Home", "Away"])
+
+
+def _desempacotar(valor):
+    valor = int(valor)
+    mascara = (1 << BITS_EQUIPA) - 1
+    return valor >> 2 * BITS_EQUIPA, (valor >> BITS_EQUIPA) & mascara, valor & mascara
+
+
+def test_chaves_empacotadas_desempacotam_para_o_jogo_original():
+    jogos = [("2026-01-01", "Benfica", "Porto"), ("2026-01-02", "Porto", "Benfica"),
+             ("1999-12-31", "Sporting", "Braga")]
+    indice = IndiceJogos()
+    indice.adicionar(_df(jogos))
+
+    nomes = {id_: nome for nome, id_ in indice._ids.items()}
+    recuperados = {(date.fromordinal(dia).isoformat(), nomes[casa], nomes[fora])
+                   for dia, casa, fora in map(_desempacotar, indice._chaves)}
+    assert recuperados == set(jogos)
+    assert len(indice) == 3
+    assert np.all(np.diff(indice._chaves.astype(np.int64)) > 0)
+
+
+def test_contem_e_in_concordam_e_distinguem_casa_de_fora():
+    indice = IndiceJogos()
+    indice.adicionar(_df([("2026-01-01", "Benfica", "Porto")]))
+    consulta = [("2026-01-01", "Benfica", "Porto"),     # gravado
+                ("2026-01-01", "Porto", "Benfica"),     # casa/fora trocados
+                ("2026-01-02", "Benfica", "Porto"),     # outro dia
+                ("2026-01-01", "Benfica", "Braga"),     # equipa nunca vista
+                ("data inválida", "Benfica", "Porto")]
+    esperado = [True, False, False, False, False]
+
+    assert list(indice.contem(_df(consulta))) == esperado
+    assert [chave in indice for chave in consulta] == esperado
+
+
+def test_adicionar_repetidos_nao_duplica_chaves():
+    indice = IndiceJogos()
+    jogos = _df([("2026-01-01", "Benfica", "Porto")] * 3)
+    indice.adicionar(jogos)
+    indice.adicionar(jogos)
+    assert len(indice) == 1
+    assert len(indice._ids) == 2
+
+
+def test_ids_nos_limites_da_chave_nao_colidem(monkeypatch):
+    indice = IndiceJogos()
+    indice.adicionar(_df([("2026-01-01", "A", "B")]))
+    # ids no topo dos 22 bits não podem invadir os bits do dia nem os da outra equipa
+    topo = (1 << BITS_EQUIPA) - 1
+    monkeypatch.setitem(indice._ids, "Ultima", topo)
+    monkeypatch.setitem(indice._ids, "Penultima", topo - 1)
+    indice.adicionar(_df([("2026-01-01", "Ultima", "Penultima")]))
+
+    assert ("2026-01-01", "Ultima", "Penultima") in indice
+    assert ("2026-01-01", "Penultima", "Ultima") not in indice
+    assert ("2026-01-02", "A", "B") not in indice
+    dia, casa, fora = _desempacotar(max(indice._chaves))
+    assert (date.fromordinal(dia).isoformat(), casa, fora) == ("2026-01-01", topo, topo - 1)
+
+
+def test_demasiadas_equipas_falha_em_vez_de_colidir(monkeypatch):
+    monkeypatch.setattr(indice_jogos, "_MASCARA_EQUIPA", 1)
+    indice = IndiceJogos()
+    with pytest.raises(OverflowError):
+        indice.adicionar(_df([("2026-01-01", "A", "B"), ("2026-01-01", "C", "D")]))
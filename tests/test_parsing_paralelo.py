@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+import benchmark
+import parsing_paralelo
+
+URL = "https://redscores.com/pt-br/futebol/time/casa"
+
+
+@pytest.fixture(scope="module")
+def html_time():
+    return benchmark._gerar_time(5)
+
+
+def test_resultados_chegam_a_ao_concluir(html_time):
+    recebidos, lock = [], threading.Lock()
+
+    def ao_concluir(jogos):
+        with lock:
+            recebidos.append(jogos)
+
+    with parsing_paralelo.PoolParsing(processos=1, em_espera=2) as parsing:
+        for _ in range(3):
+            parsing.jogos_time(html_time, URL, "Brasil - Serie A", ao_concluir=ao_concluir)
+        parsing.jogos_time("<html>sem grelha</html>", URL, "Brasil - Serie A", ao_concluir=ao_concluir)
+    assert sorted(map(bool, recebidos)) == [False, True, True, True]
+
+
+def test_falha_de_ao_concluir_sobe_em_vez_de_parecer_erro_de_parsing(html_time):
+    def ao_concluir(jogos):
+        raise RuntimeError("Gravação interrompida: disco cheio")
+
+    parsing = parsing_paralelo.PoolParsing(processos=1)
+    parsing.jogos_time(html_time, URL, "Brasil - Serie A", ao_concluir=ao_concluir)
+    with pytest.raises(RuntimeError, match="disco cheio") as erro:
+        parsing.esperar()
+    assert isinstance(erro.value.__cause__, RuntimeError)
+    # nenhuma página nova é aceite depois da falha, e fechar() volta a levantá-la
+    with pytest.raises(RuntimeError, match="disco cheio"):
+        parsing.jogos_time(html_time, URL, "Brasil - Serie A", ao_concluir=ao_concluir)
+    with pytest.raises(RuntimeError, match="disco cheio"):
+        parsing.fechar()
+    assert parsing._pool is None
+
+
+def test_sem_pool_a_falha_de_ao_concluir_sobe_logo(html_time):
+    def ao_concluir(jogos):
+        raise RuntimeError("Gravação interrompida")
+
+    with parsing_paralelo.PoolParsing(processos=0) as parsing:
+        with pytest.raises(RuntimeError, match="Gravação interrompida"):
+            parsing.jogos_time(html_time, URL, "Brasil - Serie A", ao_concluir=ao_concluir)